@@ -10,6 +10,7 @@ from model import ResUNet50   # make sure model.py defines this0
 import json
 from datetime import datetime
 import os
+import threading
 from pdf_extractor import extract_medical_fields_from_pdf
 from werkzeug.utils import secure_filename
 
@@ -20,6 +21,10 @@ DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 # Initialize Flask app
 app = Flask(__name__)
 
+# Serialize responses with orjson (handles datetime/date natively)
+from json_provider import ORJSONProvider
+app.json = ORJSONProvider(app)
+
 # Load configuration
 from config import Config
 app.config.from_object(Config)
@@ -35,13 +40,47 @@ CORS(
 from models import db
 db.init_app(app)
 
+# Initialize result cache
+from cache import cache
+cache.init_app(app)
+
 # Register blueprints
 from auth import auth_bp, require_auth  # noqa: E402
-from database import database_bp  # noqa: E402
+from database import database_bp, invalidate_patient_cache  # noqa: E402
 
 app.register_blueprint(auth_bp)
 app.register_blueprint(database_bp)
 
+# --- JSON error handlers (routes let exceptions propagate to these) ---
+from sqlalchemy.exc import SQLAlchemyError  # noqa: E402
+from werkzeug.exceptions import HTTPException  # noqa: E402
+
+
+@app.errorhandler(SQLAlchemyError)
+def handle_database_error(e):
+    """Roll back the failed transaction and report it as JSON"""
+    db.session.rollback()
+    app.logger.exception("Database error on %s %s", request.method, request.path)
+    return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+
+@app.errorhandler(HTTPException)
+def handle_http_error(e):
+    """Return aborts such as get_or_404 as JSON instead of HTML"""
+    # Start from the exception's own response to keep headers such as Allow on a 405
+    response = e.get_response()
+    response.data = app.json.dumps({"error": e.description})
+    response.content_type = "application/json"
+    return response
+
+
+@app.errorhandler(Exception)
+def handle_unexpected_error(e):
+    """Last-resort handler so API clients always get a JSON 500"""
+    db.session.rollback()
+    app.logger.exception("Unhandled error on %s %s", request.method, request.path)
+    return jsonify({"error": str(e)}), 500
+
 # --- Patient Intake API (add assignedDoctorId support) ---
 from models import db, Patient, PatientIntake, User, MedicalReport
 
@@ -78,13 +117,15 @@ def get_assigned_patients(doctor_id):
 
 @app.route('/api/doctor/<int:doctor_id>/attended-patients', methods=['GET'])
 def get_attended_patients(doctor_id):
-    # Get all patients attended by this doctor via MedicalReport
-    report_patient_ids = set(report.patient_id for report in MedicalReport.query.filter_by(doctor_id=doctor_id).all())
-    # Get all patients manually marked as attended (new logic)
-    manual_attended = PatientIntake.query.filter_by(assigned_doctor_id=doctor_id).filter(PatientIntake.report_content == 'attended').all()
-    manual_patient_ids = set(intake.patient_id for intake in manual_attended)
-    all_patient_ids = list(report_patient_ids.union(manual_patient_ids))
-    patients = Patient.query.filter(Patient.id.in_(all_patient_ids)).all() if all_patient_ids else []
+    # Patients attended by this doctor via MedicalReport, plus those manually marked as attended.
+    # Only the ids are needed, so both are column subqueries resolved in the same statement.
+    attended_patient_ids = db.union(
+        db.select(MedicalReport.patient_id).filter_by(doctor_id=doctor_id),
+        db.select(PatientIntake.patient_id)
+        .filter_by(assigned_doctor_id=doctor_id)
+        .filter(PatientIntake.report_content == 'attended'),
+    )
+    patients = Patient.query.filter(Patient.id.in_(attended_patient_ids)).all()
     return jsonify({'attended_patients': [p.to_dict() for p in patients]})
 
 @app.route('/api/doctor/<int:doctor_id>/attend-patient', methods=['POST'])
@@ -97,19 +138,16 @@ def attend_patient(doctor_id):
     patient_id = data.get('patient_id')
     if not patient_id:
         return jsonify({'error': 'Missing patient_id'}), 400
-    try:
-        # Find the latest intake for this patient assigned to this doctor
-        intake = PatientIntake.query.filter_by(patient_id=patient_id, assigned_doctor_id=doctor_id).order_by(PatientIntake.created_at.desc()).first()
-        if not intake:
-            return jsonify({'error': 'No such assigned patient'}), 404
-        # Mark as attended (use report_content field as a flag)
-        intake.report_content = 'attended'
-        intake.updated_at = datetime.utcnow()
-        db.session.commit()
-        return jsonify({'success': True, 'message': 'Patient marked as attended'})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': f'Failed to mark as attended: {str(e)}'}), 500
+    # Find the latest intake for this patient assigned to this doctor
+    intake = PatientIntake.query.filter_by(patient_id=patient_id, assigned_doctor_id=doctor_id).order_by(PatientIntake.created_at.desc()).first()
+    if not intake:
+        return jsonify({'error': 'No such assigned patient'}), 404
+    # Mark as attended (use report_content field as a flag)
+    intake.report_content = 'attended'
+    intake.updated_at = datetime.utcnow()
+    db.session.commit()
+    invalidate_patient_cache(intake.patient)
+    return jsonify({'success': True, 'message': 'Patient marked as attended'})
 
 @app.route('/api/doctor/<int:doctor_id>/undo-attend-patient', methods=['POST'])
 def undo_attend_patient(doctor_id):
@@ -121,41 +159,86 @@ def undo_attend_patient(doctor_id):
     patient_id = data.get('patient_id')
     if not patient_id:
         return jsonify({'error': 'Missing patient_id'}), 400
-    try:
-        intake = PatientIntake.query.filter_by(patient_id=patient_id, assigned_doctor_id=doctor_id).order_by(PatientIntake.created_at.desc()).first()
-        if not intake:
-            return jsonify({'error': 'No such assigned patient'}), 404
-        # Undo attended: clear the attended flag if it was set
-        if intake.report_content == 'attended':
-            intake.report_content = None
-            intake.updated_at = datetime.utcnow()
-            db.session.commit()
-        return jsonify({'success': True, 'message': 'Patient relisted as assigned'})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': f'Failed to undo attend: {str(e)}'}), 500
+    intake = PatientIntake.query.filter_by(patient_id=patient_id, assigned_doctor_id=doctor_id).order_by(PatientIntake.created_at.desc()).first()
+    if not intake:
+        return jsonify({'error': 'No such assigned patient'}), 404
+    # Undo attended: clear the attended flag if it was set
+    if intake.report_content == 'attended':
+        intake.report_content = None
+        intake.updated_at = datetime.utcnow()
+        db.session.commit()
+        invalidate_patient_cache(intake.patient)
+    return jsonify({'success': True, 'message': 'Patient relisted as assigned'})
 
 
 # Simple model cache so you don't reload on every request
 _model_cache = {}
 
+class OnnxSegmentationModel:
+    """Serves a ResUNet50 exported with model.export_onnx() through onnxruntime; called like the torch model"""
+    def __init__(self, model_path):
+        import onnxruntime as ort
+        available = ort.get_available_providers()
+        providers = [p for p in ("CUDAExecutionProvider", "CPUExecutionProvider") if p in available]
+        self.session = ort.InferenceSession(model_path, providers=providers)
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, image_tensor):
+        (logits,) = self.session.run(None, {self.input_name: image_tensor.cpu().numpy()})
+        return torch.from_numpy(logits)
+
+class CudaGraphModel:
+    """Replays a captured CUDA graph of the forward pass for the fixed 1x3x256x256 input; called like the torch model"""
+    def __init__(self, model, input_shape=(1, 3, 256, 256), warmup_iters=3):
+        self.model = model.to(memory_format=torch.channels_last)
+        self.static_input = torch.zeros(input_shape, device=DEVICE).contiguous(memory_format=torch.channels_last)
+        # One set of static buffers, so concurrent requests must take turns
+        self._lock = threading.Lock()
+        with torch.inference_mode():
+            # Warm up on a side stream so cuDNN/allocator setup is not recorded
+            side = torch.cuda.Stream()
+            side.wait_stream(torch.cuda.current_stream())
+            with torch.cuda.stream(side):
+                for _ in range(warmup_iters):
+                    self.model(self.static_input)
+            torch.cuda.current_stream().wait_stream(side)
+            self.graph = torch.cuda.CUDAGraph()
+            with torch.cuda.graph(self.graph):
+                self.static_output = self.model(self.static_input)
+
+    def __call__(self, image_tensor):
+        if image_tensor.shape != self.static_input.shape:
+            return self.model(image_tensor)
+        with self._lock:
+            self.static_input.copy_(image_tensor)
+            self.graph.replay()
+            return self.static_output.clone()
+
 def get_model(model_path):
     if model_path in _model_cache:
         return _model_cache[model_path]
 
-    model = ResUNet50(out_channels=1, pretrained=False)
-    state = torch.load(model_path, map_location=DEVICE)
+    # Exported graphs already have BatchNorm folded in by ONNX constant folding
+    if model_path.endswith(".onnx"):
+        model = OnnxSegmentationModel(model_path)
+        _model_cache[model_path] = model
+        return model
 
+    model = ResUNet50(out_channels=1, pretrained=False)
+    # Map the checkpoint from disk on CPU and copy to DEVICE once in model.to(),
+    # instead of unpickling a second full copy straight onto the device
+    state = torch.load(model_path, map_location="cpu", mmap=True, weights_only=True)
     if isinstance(state, dict) and "state_dict" in state:
-        model.load_state_dict(state["state_dict"])
-    else:
-        try:
-            model.load_state_dict(state)
-        except Exception:
-            model = state
+        state = state["state_dict"]
+    model.load_state_dict(state, strict=True)
+    del state
 
     model.to(DEVICE)
     model.eval()
+    # Fold BatchNorm into the preceding convs; inference only
+    model.fuse_for_inference()
+    if DEVICE.type == "cuda":
+        model = CudaGraphModel(model)
     _model_cache[model_path] = model
     return model
 
@@ -176,10 +259,10 @@ def preprocess_image(image_data, target_size=(256, 256)):
     return image, image_tensor
 
 def predict(model, image_tensor):
-    with torch.no_grad():
+    with torch.inference_mode():
         image_tensor = image_tensor.to(DEVICE)
-        out = model(image_tensor)
-        out = torch.sigmoid(out)
+        out = model(image_tensor)  # logits
+        out.sigmoid_()
         out = (out > 0.5).float()
     return out
 
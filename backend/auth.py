@@ -9,7 +9,8 @@ from datetime import datetime, timedelta
 
 from flask import Blueprint, current_app, jsonify, make_response, request
 from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
-from werkzeug.security import check_password_hash, generate_password_hash
+
+from passwords import hash_password, verify_password
 
 
 SESSION_COOKIE_NAME = "ras_session"
@@ -50,7 +51,7 @@ AUTHORIZED_DOCTORS = [
         full_name="Dr. John Smith",
         specialty="Radiology",
         department="Radiology Department",
-        password_hash=generate_password_hash("123")
+        password_hash=hash_password("123")
     ),
     Doctor(
         id=2,
@@ -58,7 +59,7 @@ AUTHORIZED_DOCTORS = [
         full_name="Dr. Sarah Johnson", 
         specialty="Neurology",
         department="Neurology Department",
-        password_hash=generate_password_hash("Johnson2024!")
+        password_hash=hash_password("Johnson2024!")
     ),
     Doctor(
         id=3,
@@ -66,7 +67,7 @@ AUTHORIZED_DOCTORS = [
         full_name="Dr. Michael Williams",
         specialty="Oncology", 
         department="Oncology Department",
-        password_hash=generate_password_hash("Williams2024!")
+        password_hash=hash_password("Williams2024!")
     ),
     Doctor(
         id=4,
@@ -74,7 +75,7 @@ AUTHORIZED_DOCTORS = [
         full_name="Dr. Emily Brown",
         specialty="Cardiology",
         department="Cardiology Department", 
-        password_hash=generate_password_hash("Brown2024!")
+        password_hash=hash_password("Brown2024!")
     ),
     Doctor(
         id=5,
@@ -82,7 +83,7 @@ AUTHORIZED_DOCTORS = [
         full_name="Dr. Robert Davis",
         specialty="Emergency Medicine",
         department="Emergency Department",
-        password_hash=generate_password_hash("Davis2024!")
+        password_hash=hash_password("Davis2024!")
     ),
     Doctor(
         id=6,
@@ -90,7 +91,7 @@ AUTHORIZED_DOCTORS = [
         full_name="Dr. Lisa Wilson",
         specialty="Pediatrics",
         department="Pediatrics Department",
-        password_hash=generate_password_hash("Wilson2024!")
+        password_hash=hash_password("Wilson2024!")
     ),
     Doctor(
         id=7,
@@ -98,7 +99,7 @@ AUTHORIZED_DOCTORS = [
         full_name="Dr. Carlos Martinez",
         specialty="Orthopedics",
         department="Orthopedics Department",
-        password_hash=generate_password_hash("Martinez2024!")
+        password_hash=hash_password("Martinez2024!")
     )
 ]
 
@@ -111,7 +112,7 @@ AUTHORIZED_RECEPTIONISTS: List[Receptionist] = [
         email="reception@hospital.com",
         full_name="Alex Parker",
         department="Front Desk",
-        password_hash=generate_password_hash("1234")
+        password_hash=hash_password("1234")
     )
 ]
 
@@ -158,7 +159,7 @@ def _validate_credentials(email: str, password: str) -> Optional[Doctor]:
     if not doctor.is_active:
         return None
     
-    if check_password_hash(doctor.password_hash, password):
+    if verify_password(doctor.password_hash, password):
         return doctor
     
     return None
@@ -171,7 +172,7 @@ def _validate_receptionist_credentials(email: str, password: str) -> Optional[Re
     receptionist = ACTIVE_RECEPTIONISTS[email]
     if not receptionist.is_active:
         return None
-    if check_password_hash(receptionist.password_hash, password):
+    if verify_password(receptionist.password_hash, password):
         return receptionist
     return None
 
@@ -0,0 +1,5 @@
+from flask_caching import Cache
+
+# Shared result cache (Redis-backed by default, see Config.CACHE_TYPE).
+# Initialised against the Flask app in app.py, same as the SQLAlchemy db.
+cache = Cache()
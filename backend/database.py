@@ -1,14 +1,90 @@
 from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy.orm import joinedload
 from werkzeug.utils import secure_filename
 import os
 import uuid
+import hashlib
 from datetime import datetime
+from typing import Optional, Union
+import msgspec
 from models import db, User, Patient, MedicalReport, PatientSession, PatientIntake
 from auth import require_auth
+from cache import cache
 import json
 
 database_bp = Blueprint('database', __name__, url_prefix='/api')
 
+DASHBOARD_STATS_CACHE_KEY = 'dashboard_stats'
+
+ALLOWED_EXTENSIONS = frozenset({'pdf', 'png', 'jpg', 'jpeg'})
+ALLOWED_MIMETYPES = frozenset({'application/pdf', 'image/png', 'image/jpeg'})
+
+# Columns returned by list views; full records come from the detail endpoints
+PATIENT_LIST_COLUMNS = (
+    Patient.id,
+    Patient.patient_id,
+    Patient.first_name,
+    Patient.last_name,
+    Patient.date_of_birth,
+    Patient.gender,
+    Patient.phone,
+    Patient.registration_date,
+)
+REPORT_LIST_COLUMNS = (
+    MedicalReport.id,
+    MedicalReport.report_id,
+    MedicalReport.patient_id,
+    MedicalReport.report_type,
+    MedicalReport.report_date,
+    MedicalReport.referring_physician,
+    MedicalReport.affected_percentage,
+    MedicalReport.doctor_id,
+    MedicalReport.is_edited,
+    MedicalReport.status,
+    MedicalReport.created_at,
+    MedicalReport.updated_at,
+)
+
+class IntakePayload(msgspec.Struct):
+    """Request body for POST /api/intake, decoded straight from JSON"""
+    patientName: str
+    age: Union[str, int]  # clients send either "45" or 45
+    contactNumber: str
+    sex: Optional[str] = None
+    dob: Optional[str] = None
+    email: Optional[str] = None
+    address: Optional[str] = None
+    abhaId: Optional[str] = None
+    previousCondition: Optional[str] = None
+    currentMedication: Optional[str] = None
+    familyHistory: Optional[str] = None
+    knownAllergy: Optional[str] = None
+    chiefComplaint: Optional[str] = None
+    referringDoctor: Optional[str] = None
+    neurologicalSymptom: Optional[str] = None
+    treatmentHistory: Optional[str] = None
+    symptomProgression: Optional[str] = None
+    reportContent: Optional[str] = None
+    previousReportPdf: Optional[str] = None
+    extractedData: Optional[dict] = None
+    assignedDoctorId: Optional[int] = None
+    highPriority: bool = False
+
+class PatientPayload(msgspec.Struct):
+    """Request body for POST /api/patients, decoded straight from JSON"""
+    first_name: str
+    last_name: str
+    date_of_birth: str
+    gender: str
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    address: Optional[str] = None
+    blood_group: Optional[str] = None
+    known_allergies: Optional[str] = None
+    medical_history: Optional[str] = None
+    current_medications: Optional[str] = None
+    family_history: Optional[str] = None
+
 def generate_patient_id():
     """Generate a unique patient ID"""
     return f"PAT-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
@@ -19,8 +95,97 @@ def generate_report_id():
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
-    ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg'}
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    _, sep, ext = filename.rpartition('.')
+    return bool(sep) and ext.lower() in ALLOWED_EXTENSIONS
+
+def _json_with_etag(payload, *version):
+    """jsonify payload with an ETag derived from version, answering 304 if the client already has it"""
+    etag = hashlib.blake2b(':'.join(map(str, version)).encode(), digest_size=16).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(payload)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, max-age=5'
+    return response
+
+def _rows_to_dicts(rows):
+    """Convert projected rows into dicts without hydrating ORM objects"""
+    return [dict(row._mapping) for row in rows]
+
+@cache.memoize(timeout=60)
+def _patient_payload(patient_id):
+    """Patient details with medical reports, cached per primary key"""
+    patient = Patient.query.get(patient_id)
+    if not patient:
+        return None
+    
+    reports = MedicalReport.query.filter_by(patient_id=patient_id).order_by(MedicalReport.created_at.desc()).all()
+    
+    patient_data = patient.to_dict()
+    patient_data['medical_reports'] = [report.to_dict() for report in reports]
+    return patient_data
+
+@cache.memoize(timeout=60)
+def _patient_payload_by_custom_id(custom_patient_id):
+    """Patient details with latest intake and medical reports, cached per custom patient ID"""
+    patient = Patient.query.filter_by(patient_id=custom_patient_id).first()
+    if not patient:
+        return None
+    
+    # Get latest intake record
+    intake = PatientIntake.query.filter_by(patient_id=patient.id).order_by(PatientIntake.created_at.desc()).first()
+    
+    # Get all medical reports
+    reports = MedicalReport.query.filter_by(patient_id=patient.id).order_by(MedicalReport.created_at.desc()).all()
+    
+    patient_data = patient.to_dict()
+    patient_data['intake'] = intake.to_dict() if intake else None
+    patient_data['medical_reports'] = [report.to_dict() for report in reports]
+    return patient_data
+
+@cache.cached(timeout=15, key_prefix=DASHBOARD_STATS_CACHE_KEY)
+def _dashboard_stats_payload():
+    """Dashboard counters and recent activity, cached for a few seconds"""
+    total_patients = Patient.query.count()
+    total_reports = MedicalReport.query.count()
+    pending_reports = MedicalReport.query.filter_by(status='pending').count()
+    processed_reports = MedicalReport.query.filter_by(status='ai_processed').count()
+    reviewed_reports = MedicalReport.query.filter_by(status='doctor_reviewed').count()
+    
+    # Get recent patients
+    recent_patients = db.session.execute(
+        db.select(*PATIENT_LIST_COLUMNS).order_by(Patient.registration_date.desc()).limit(5)
+    ).all()
+    
+    # Get recent reports
+    recent_reports = db.session.execute(
+        db.select(*REPORT_LIST_COLUMNS).order_by(MedicalReport.created_at.desc()).limit(5)
+    ).all()
+    
+    return {
+        "stats": {
+            "total_patients": total_patients,
+            "total_reports": total_reports,
+            "pending_reports": pending_reports,
+            "processed_reports": processed_reports,
+            "reviewed_reports": reviewed_reports
+        },
+        "recent_patients": _rows_to_dicts(recent_patients),
+        "recent_reports": _rows_to_dicts(recent_reports)
+    }
+
+def invalidate_patient_cache(patient=None):
+    """Drop cached payloads made stale by a write to a patient's records"""
+    # Runs after the commit: if the cache backend is down the write has still
+    # succeeded, so log it and let the entries expire instead of failing the request
+    try:
+        cache.delete(DASHBOARD_STATS_CACHE_KEY)
+        if patient is not None:
+            cache.delete_memoized(_patient_payload, patient.id)
+            cache.delete_memoized(_patient_payload_by_custom_id, patient.patient_id)
+    except Exception:
+        current_app.logger.exception("Failed to invalidate cached patient payloads")
 
 # Patient Intake Routes
 @database_bp.route('/intake', methods=['POST'])
@@ -31,80 +196,82 @@ def create_patient_intake():
         return jsonify({"error": "Unauthorized - Receptionist access required"}), 401
     
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ['patientName', 'age', 'contactNumber']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        # Validate and parse date of birth
-        date_of_birth = None
-        if data.get('dob'):
-            try:
-                date_of_birth = datetime.strptime(data['dob'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({"error": f"Invalid date format: {data['dob']}. Please use YYYY-MM-DD format."}), 400
-        
-        # Create new patient first
-        patient = Patient(
-            patient_id=generate_patient_id(),
-            first_name=data['patientName'].split(' ')[0] if ' ' in data['patientName'] else data['patientName'],
-            last_name=data['patientName'].split(' ')[1] if ' ' in data['patientName'] else '',
-            date_of_birth=date_of_birth or datetime.now().date(),
-            gender=data.get('sex', 'Unknown'),
-            phone=data.get('contactNumber'),
-            email=data.get('email'),
-            address=data.get('address'),
-            known_allergies=data.get('knownAllergy'),
-            medical_history=data.get('previousCondition'),
-            current_medications=data.get('currentMedication'),
-            family_history=data.get('familyHistory'),
-            registered_by=user.id
-        )
-        
-        db.session.add(patient)
-        db.session.flush()  # Get the patient ID without committing
-        
-        # Create intake record
-        intake = PatientIntake(
-            patient_id=patient.id,
-            age=data.get('age'),
-            sex=data.get('sex'),
-            dob=date_of_birth,  # Use the validated date
-            contact_number=data.get('contactNumber'),
-            abha_id=data.get('abhaId'),
-            previous_condition=data.get('previousCondition'),
-            current_medication=data.get('currentMedication'),
-            family_history=data.get('familyHistory'),
-            known_allergy=data.get('knownAllergy'),
-            chief_complaint=data.get('chiefComplaint'),
-            referring_doctor=data.get('referringDoctor'),
-            neurological_symptom=data.get('neurologicalSymptom'),
-            treatment_history=data.get('treatmentHistory'),
-            symptom_progression=data.get('symptomProgression'),
-            report_content=data.get('reportContent'),
-            previous_report_pdf=data.get('previousReportPdf'),
-            extracted_data=data.get('extractedData'),
-            created_by=user.id,
-            assigned_doctor_id=data.get('assignedDoctorId'),
-            high_priority=data.get('highPriority', False)
-        )
-        
-        db.session.add(intake)
-        db.session.commit()
-        
-        return jsonify({
-            "success": True,
-            "message": "Patient intake created successfully",
-            "patient": patient.to_dict(),
-            "intake": intake.to_dict()
-        }), 201
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"error": f"Failed to create patient intake: {str(e)}"}), 500
+        payload = msgspec.json.decode(request.get_data(), type=IntakePayload)
+    except msgspec.DecodeError as e:
+        return jsonify({"error": f"Invalid intake data: {str(e)}"}), 400
+    
+    # Validate required fields
+    required_fields = ['patientName', 'age', 'contactNumber']
+    for field in required_fields:
+        if not getattr(payload, field):
+            return jsonify({"error": f"Missing required field: {field}"}), 400
+    
+    # Validate and parse date of birth
+    date_of_birth = None
+    if payload.dob:
+        try:
+            date_of_birth = datetime.strptime(payload.dob, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({"error": f"Invalid date format: {payload.dob}. Please use YYYY-MM-DD format."}), 400
+    
+    # Split name once; everything after the first word is the last name
+    first_name, _, last_name = payload.patientName.strip().partition(' ')
+    
+    # Create new patient first
+    patient = Patient(
+        patient_id=generate_patient_id(),
+        first_name=first_name,
+        last_name=last_name.strip(),
+        date_of_birth=date_of_birth or datetime.now().date(),
+        gender=payload.sex or 'Unknown',
+        phone=payload.contactNumber,
+        email=payload.email,
+        address=payload.address,
+        known_allergies=payload.knownAllergy,
+        medical_history=payload.previousCondition,
+        current_medications=payload.currentMedication,
+        family_history=payload.familyHistory,
+        registered_by=user.id
+    )
+    
+    db.session.add(patient)
+    db.session.flush()  # Get the patient ID without committing
+    
+    # Create intake record
+    intake = PatientIntake(
+        patient_id=patient.id,
+        age=str(payload.age),
+        sex=payload.sex,
+        dob=date_of_birth,  # Use the validated date
+        contact_number=payload.contactNumber,
+        abha_id=payload.abhaId,
+        previous_condition=payload.previousCondition,
+        current_medication=payload.currentMedication,
+        family_history=payload.familyHistory,
+        known_allergy=payload.knownAllergy,
+        chief_complaint=payload.chiefComplaint,
+        referring_doctor=payload.referringDoctor,
+        neurological_symptom=payload.neurologicalSymptom,
+        treatment_history=payload.treatmentHistory,
+        symptom_progression=payload.symptomProgression,
+        report_content=payload.reportContent,
+        previous_report_pdf=payload.previousReportPdf,
+        extracted_data=payload.extractedData,
+        created_by=user.id,
+        assigned_doctor_id=payload.assignedDoctorId,
+        high_priority=payload.highPriority
+    )
+    
+    db.session.add(intake)
+    db.session.commit()
+    invalidate_patient_cache(patient)
+    
+    return jsonify({
+        "success": True,
+        "message": "Patient intake created successfully",
+        "patient": patient.to_dict(),
+        "intake": intake.to_dict()
+    }), 201
 
 @database_bp.route('/intake/<int:patient_id>', methods=['GET'])
 def get_patient_intake(patient_id):
@@ -113,27 +280,23 @@ def get_patient_intake(patient_id):
     if not user:
         return jsonify({"error": "Unauthorized"}), 401
     
-    try:
-        # Get patient
-        patient = Patient.query.get_or_404(patient_id)
-        
-        # Get latest intake record
-        intake = PatientIntake.query.filter_by(patient_id=patient_id).order_by(PatientIntake.created_at.desc()).first()
-        
-        # Get all medical reports
-        reports = MedicalReport.query.filter_by(patient_id=patient_id).order_by(MedicalReport.created_at.desc()).all()
-        
-        patient_data = patient.to_dict()
-        patient_data['intake'] = intake.to_dict() if intake else None
-        patient_data['medical_reports'] = [report.to_dict() for report in reports]
-        
-        return jsonify({
-            "success": True,
-            "patient": patient_data
-        }), 200
-        
-    except Exception as e:
-        return jsonify({"error": f"Failed to fetch patient intake: {str(e)}"}), 500
+    # Get patient
+    patient = Patient.query.get_or_404(patient_id)
+    
+    # Get latest intake record
+    intake = PatientIntake.query.filter_by(patient_id=patient_id).order_by(PatientIntake.created_at.desc()).first()
+    
+    # Get all medical reports
+    reports = MedicalReport.query.filter_by(patient_id=patient_id).order_by(MedicalReport.created_at.desc()).all()
+    
+    patient_data = patient.to_dict()
+    patient_data['intake'] = intake.to_dict() if intake else None
+    patient_data['medical_reports'] = [report.to_dict() for report in reports]
+    
+    return jsonify({
+        "success": True,
+        "patient": patient_data
+    }), 200
 
 @database_bp.route('/patients/search-by-id', methods=['GET'])
 def search_patient_by_custom_id():
@@ -146,28 +309,14 @@ def search_patient_by_custom_id():
     if not patient_id:
         return jsonify({"error": "Patient ID is required"}), 400
     
-    try:
-        patient = Patient.query.filter_by(patient_id=patient_id).first()
-        if not patient:
-            return jsonify({"error": "Patient not found"}), 404
-        
-        # Get latest intake record
-        intake = PatientIntake.query.filter_by(patient_id=patient.id).order_by(PatientIntake.created_at.desc()).first()
-        
-        # Get all medical reports
-        reports = MedicalReport.query.filter_by(patient_id=patient.id).order_by(MedicalReport.created_at.desc()).all()
-        
-        patient_data = patient.to_dict()
-        patient_data['intake'] = intake.to_dict() if intake else None
-        patient_data['medical_reports'] = [report.to_dict() for report in reports]
-        
-        return jsonify({
-            "success": True,
-            "patient": patient_data
-        }), 200
-        
-    except Exception as e:
-        return jsonify({"error": f"Failed to search patient: {str(e)}"}), 500
+    patient_data = _patient_payload_by_custom_id(patient_id)
+    if not patient_data:
+        return jsonify({"error": "Patient not found"}), 404
+    
+    return jsonify({
+        "success": True,
+        "patient": patient_data
+    }), 200
 
 # Patient Management Routes
 @database_bp.route('/patients', methods=['POST'])
@@ -178,84 +327,107 @@ def create_patient():
         return jsonify({"error": "Unauthorized - Receptionist access required"}), 401
     
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ['first_name', 'last_name', 'date_of_birth', 'gender']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        # Create new patient
-        patient = Patient(
-            patient_id=generate_patient_id(),
-            first_name=data['first_name'],
-            last_name=data['last_name'],
-            date_of_birth=datetime.strptime(data['date_of_birth'], '%Y-%m-%d').date(),
-            gender=data['gender'],
-            phone=data.get('phone'),
-            email=data.get('email'),
-            address=data.get('address'),
-            blood_group=data.get('blood_group'),
-            known_allergies=data.get('known_allergies'),
-            medical_history=data.get('medical_history'),
-            current_medications=data.get('current_medications'),
-            family_history=data.get('family_history'),
-            registered_by=user.id
-        )
-        
-        db.session.add(patient)
-        db.session.commit()
-        
-        return jsonify({
-            "success": True,
-            "message": "Patient created successfully",
-            "patient": patient.to_dict()
-        }), 201
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"error": f"Failed to create patient: {str(e)}"}), 500
+        payload = msgspec.json.decode(request.get_data(), type=PatientPayload)
+    except msgspec.DecodeError as e:
+        return jsonify({"error": f"Invalid patient data: {str(e)}"}), 400
+    
+    # Validate required fields
+    required_fields = ['first_name', 'last_name', 'date_of_birth', 'gender']
+    for field in required_fields:
+        if not getattr(payload, field):
+            return jsonify({"error": f"Missing required field: {field}"}), 400
+    
+    try:
+        date_of_birth = datetime.strptime(payload.date_of_birth, '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({"error": f"Invalid date format: {payload.date_of_birth}. Please use YYYY-MM-DD format."}), 400
+    
+    # Create new patient
+    patient = Patient(
+        patient_id=generate_patient_id(),
+        first_name=payload.first_name,
+        last_name=payload.last_name,
+        date_of_birth=date_of_birth,
+        gender=payload.gender,
+        phone=payload.phone,
+        email=payload.email,
+        address=payload.address,
+        blood_group=payload.blood_group,
+        known_allergies=payload.known_allergies,
+        medical_history=payload.medical_history,
+        current_medications=payload.current_medications,
+        family_history=payload.family_history,
+        registered_by=user.id
+    )
+    
+    db.session.add(patient)
+    db.session.commit()
+    invalidate_patient_cache(patient)
+    
+    return jsonify({
+        "success": True,
+        "message": "Patient created successfully",
+        "patient": patient.to_dict()
+    }), 201
 
 @database_bp.route('/patients', methods=['GET'])
 def get_patients():
-    """Get all patients (with optional search)"""
+    """Get patients newest first (with optional search), paginated by keyset cursor"""
     user = require_auth(request)
     if not user:
         return jsonify({"error": "Unauthorized"}), 401
     
-    try:
-        search = request.args.get('search', '')
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-        
-        query = Patient.query
-        
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                db.or_(
-                    Patient.patient_id.ilike(search_term),
-                    Patient.first_name.ilike(search_term),
-                    Patient.last_name.ilike(search_term),
-                    Patient.phone.ilike(search_term)
-                )
+    search = request.args.get('search', '')
+    per_page = request.args.get('per_page', 20, type=int)
+    if per_page < 1:
+        per_page = 20
+    
+    # Keyset cursor: (registration_date, id) of the last row on the previous page
+    cursor = request.args.get('cursor')
+    last_id = request.args.get('last_id', type=int)
+    if cursor:
+        try:
+            cursor = datetime.fromisoformat(cursor)
+        except ValueError:
+            return jsonify({"error": f"Invalid cursor: {cursor}"}), 400
+        if last_id is None:
+            return jsonify({"error": "last_id is required with cursor"}), 400
+    
+    query = db.select(*PATIENT_LIST_COLUMNS)
+    
+    if search:
+        search_term = f"%{search}%"
+        query = query.where(
+            db.or_(
+                Patient.patient_id.ilike(search_term),
+                Patient.first_name.ilike(search_term),
+                Patient.last_name.ilike(search_term),
+                Patient.phone.ilike(search_term)
             )
-        
-        patients = query.order_by(Patient.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
         )
-        
-        return jsonify({
-            "success": True,
-            "patients": [patient.to_dict() for patient in patients.items],
-            "total": patients.total,
-            "pages": patients.pages,
-            "current_page": page
-        }), 200
-        
-    except Exception as e:
-        return jsonify({"error": f"Failed to fetch patients: {str(e)}"}), 500
+    
+    if cursor:
+        query = query.where(db.tuple_(Patient.registration_date, Patient.id) < (cursor, last_id))
+    
+    # Fetch one extra row to know whether another page follows
+    patients = db.session.execute(
+        query.order_by(Patient.registration_date.desc(), Patient.id.desc()).limit(per_page + 1)
+    ).all()
+    has_more = len(patients) > per_page
+    patients = patients[:per_page]
+    
+    next_cursor = next_last_id = None
+    if has_more:
+        next_cursor = patients[-1].registration_date.isoformat()
+        next_last_id = patients[-1].id
+    
+    return jsonify({
+        "success": True,
+        "patients": _rows_to_dicts(patients),
+        "has_more": has_more,
+        "next_cursor": next_cursor,
+        "next_last_id": next_last_id
+    }), 200
 
 @database_bp.route('/patients/<int:patient_id>', methods=['GET'])
 def get_patient(patient_id):
@@ -264,22 +436,17 @@ def get_patient(patient_id):
     if not user:
         return jsonify({"error": "Unauthorized"}), 401
     
-    try:
-        patient = Patient.query.get_or_404(patient_id)
-        
-        # Get patient's medical reports
-        reports = MedicalReport.query.filter_by(patient_id=patient_id).order_by(MedicalReport.created_at.desc()).all()
-        
-        patient_data = patient.to_dict()
-        patient_data['medical_reports'] = [report.to_dict() for report in reports]
-        
-        return jsonify({
-            "success": True,
-            "patient": patient_data
-        }), 200
-        
-    except Exception as e:
-        return jsonify({"error": f"Failed to fetch patient: {str(e)}"}), 500
+    patient_data = _patient_payload(patient_id)
+    if not patient_data:
+        return jsonify({"error": "Patient not found"}), 404
+    
+    reports = patient_data['medical_reports']
+    return _json_with_etag(
+        {"success": True, "patient": patient_data},
+        patient_data['updated_at'],
+        len(reports),
+        max((r['updated_at'] for r in reports if r['updated_at']), default=None),
+    )
 
 @database_bp.route('/patients/search', methods=['GET'])
 def search_patient():
@@ -292,24 +459,20 @@ def search_patient():
     if not patient_id:
         return jsonify({"error": "Patient ID is required"}), 400
     
-    try:
-        patient = Patient.query.filter_by(patient_id=patient_id).first()
-        if not patient:
-            return jsonify({"error": "Patient not found"}), 404
-        
-        # Get patient's medical reports
-        reports = MedicalReport.query.filter_by(patient_id=patient.id).order_by(MedicalReport.created_at.desc()).all()
-        
-        patient_data = patient.to_dict()
-        patient_data['medical_reports'] = [report.to_dict() for report in reports]
-        
-        return jsonify({
-            "success": True,
-            "patient": patient_data
-        }), 200
-        
-    except Exception as e:
-        return jsonify({"error": f"Failed to search patient: {str(e)}"}), 500
+    patient = Patient.query.filter_by(patient_id=patient_id).first()
+    if not patient:
+        return jsonify({"error": "Patient not found"}), 404
+    
+    # Get patient's medical reports
+    reports = MedicalReport.query.filter_by(patient_id=patient.id).order_by(MedicalReport.created_at.desc()).all()
+    
+    patient_data = patient.to_dict()
+    patient_data['medical_reports'] = [report.to_dict() for report in reports]
+    
+    return jsonify({
+        "success": True,
+        "patient": patient_data
+    }), 200
 
 # Medical Report Routes
 @database_bp.route('/reports', methods=['POST'])
@@ -319,43 +482,39 @@ def create_medical_report():
     if not user or user.role != 'receptionist':
         return jsonify({"error": "Unauthorized - Receptionist access required"}), 401
     
-    try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ['patient_id', 'report_type']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        # Check if patient exists
-        patient = Patient.query.get(data['patient_id'])
-        if not patient:
-            return jsonify({"error": "Patient not found"}), 404
-        
-        # Create new report
-        report = MedicalReport(
-            report_id=generate_report_id(),
-            patient_id=data['patient_id'],
-            report_type=data['report_type'],
-            referring_physician=data.get('referring_physician'),
-            chief_complaint=data.get('chief_complaint'),
-            extracted_data=data.get('extracted_data'),
-            status='pending'
-        )
-        
-        db.session.add(report)
-        db.session.commit()
-        
-        return jsonify({
-            "success": True,
-            "message": "Medical report created successfully",
-            "report": report.to_dict()
-        }), 201
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"error": f"Failed to create report: {str(e)}"}), 500
+    data = request.get_json()
+    
+    # Validate required fields
+    required_fields = ['patient_id', 'report_type']
+    for field in required_fields:
+        if not data.get(field):
+            return jsonify({"error": f"Missing required field: {field}"}), 400
+    
+    # Check if patient exists
+    patient = Patient.query.get(data['patient_id'])
+    if not patient:
+        return jsonify({"error": "Patient not found"}), 404
+    
+    # Create new report
+    report = MedicalReport(
+        report_id=generate_report_id(),
+        patient_id=data['patient_id'],
+        report_type=data['report_type'],
+        referring_physician=data.get('referring_physician'),
+        chief_complaint=data.get('chief_complaint'),
+        extracted_data=data.get('extracted_data'),
+        status='pending'
+    )
+    
+    db.session.add(report)
+    db.session.commit()
+    invalidate_patient_cache(patient)
+    
+    return jsonify({
+        "success": True,
+        "message": "Medical report created successfully",
+        "report": report.to_dict()
+    }), 201
 
 @database_bp.route('/reports/<int:report_id>', methods=['PUT'])
 def update_medical_report(report_id):
@@ -364,40 +523,37 @@ def update_medical_report(report_id):
     if not user or user.role != 'doctor':
         return jsonify({"error": "Unauthorized - Doctor access required"}), 401
     
-    try:
-        report = MedicalReport.query.get_or_404(report_id)
-        data = request.get_json()
-        
-        # Update report fields
-        if 'doctor_review' in data:
-            report.doctor_review = data['doctor_review']
-            report.is_edited = True
-            report.edited_at = datetime.utcnow()
-            report.doctor_id = user.id
-            report.status = 'doctor_reviewed'
-        
-        if 'ai_generated_report' in data:
-            report.ai_generated_report = data['ai_generated_report']
-        
-        if 'affected_percentage' in data:
-            report.affected_percentage = data['affected_percentage']
-        
-        if 'segmentation_image_path' in data:
-            report.segmentation_image_path = data['segmentation_image_path']
-        
-        report.updated_at = datetime.utcnow()
-        
-        db.session.commit()
-        
-        return jsonify({
-            "success": True,
-            "message": "Report updated successfully",
-            "report": report.to_dict()
-        }), 200
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"error": f"Failed to update report: {str(e)}"}), 500
+    # Patient is needed for cache invalidation; load it in the same query
+    report = MedicalReport.query.options(joinedload(MedicalReport.patient)).filter_by(id=report_id).first_or_404()
+    data = request.get_json()
+    
+    # Update report fields
+    if 'doctor_review' in data:
+        report.doctor_review = data['doctor_review']
+        report.is_edited = True
+        report.edited_at = datetime.utcnow()
+        report.doctor_id = user.id
+        report.status = 'doctor_reviewed'
+    
+    if 'ai_generated_report' in data:
+        report.ai_generated_report = data['ai_generated_report']
+    
+    if 'affected_percentage' in data:
+        report.affected_percentage = data['affected_percentage']
+    
+    if 'segmentation_image_path' in data:
+        report.segmentation_image_path = data['segmentation_image_path']
+    
+    report.updated_at = datetime.utcnow()
+    
+    db.session.commit()
+    invalidate_patient_cache(report.patient)
+    
+    return jsonify({
+        "success": True,
+        "message": "Report updated successfully",
+        "report": report.to_dict()
+    }), 200
 
 @database_bp.route('/reports/<int:report_id>', methods=['GET'])
 def get_medical_report(report_id):
@@ -406,22 +562,17 @@ def get_medical_report(report_id):
     if not user:
         return jsonify({"error": "Unauthorized"}), 401
     
-    try:
-        report = MedicalReport.query.get_or_404(report_id)
-        
-        # Get patient information
-        patient = Patient.query.get(report.patient_id)
-        
-        report_data = report.to_dict()
-        report_data['patient'] = patient.to_dict() if patient else None
-        
-        return jsonify({
-            "success": True,
-            "report": report_data
-        }), 200
-        
-    except Exception as e:
-        return jsonify({"error": f"Failed to fetch report: {str(e)}"}), 500
+    # Fetch the report together with its patient in a single query
+    report = MedicalReport.query.options(joinedload(MedicalReport.patient)).filter_by(id=report_id).first_or_404()
+    
+    report_data = report.to_dict()
+    report_data['patient'] = report.patient.to_dict() if report.patient else None
+    
+    return _json_with_etag(
+        {"success": True, "report": report_data},
+        report.updated_at,
+        report.patient.updated_at if report.patient else None,
+    )
 
 @database_bp.route('/reports/patient/<int:patient_id>', methods=['GET'])
 def get_patient_reports(patient_id):
@@ -430,16 +581,17 @@ def get_patient_reports(patient_id):
     if not user:
         return jsonify({"error": "Unauthorized"}), 401
     
-    try:
-        reports = MedicalReport.query.filter_by(patient_id=patient_id).order_by(MedicalReport.created_at.desc()).all()
-        
-        return jsonify({
-            "success": True,
-            "reports": [report.to_dict() for report in reports]
-        }), 200
-        
-    except Exception as e:
-        return jsonify({"error": f"Failed to fetch reports: {str(e)}"}), 500
+    reports = db.session.execute(
+        db.select(*REPORT_LIST_COLUMNS)
+        .where(MedicalReport.patient_id == patient_id)
+        .order_by(MedicalReport.created_at.desc())
+        .execution_options(yield_per=200)
+    )
+    
+    return jsonify({
+        "success": True,
+        "reports": _rows_to_dicts(reports)
+    }), 200
 
 # File Upload Route
 @database_bp.route('/upload', methods=['POST'])
@@ -449,39 +601,39 @@ def upload_file():
     if not user:
         return jsonify({"error": "Unauthorized"}), 401
     
-    try:
-        if 'file' not in request.files:
-            return jsonify({"error": "No file provided"}), 400
-        
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({"error": "No file selected"}), 400
-        
-        if not allowed_file(file.filename):
-            return jsonify({"error": "File type not allowed"}), 400
-        
-        # Create uploads directory if it doesn't exist
-        upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
-        if not os.path.exists(upload_folder):
-            os.makedirs(upload_folder)
-        
-        # Generate unique filename
-        filename = secure_filename(file.filename)
-        unique_filename = f"{uuid.uuid4()}_{filename}"
-        file_path = os.path.join(upload_folder, unique_filename)
-        
-        # Save file
-        file.save(file_path)
-        
-        return jsonify({
-            "success": True,
-            "message": "File uploaded successfully",
-            "filename": unique_filename,
-            "file_path": file_path
-        }), 200
-        
-    except Exception as e:
-        return jsonify({"error": f"Failed to upload file: {str(e)}"}), 500
+    if 'file' not in request.files:
+        return jsonify({"error": "No file provided"}), 400
+    
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"error": "No file selected"}), 400
+    
+    if not allowed_file(file.filename):
+        return jsonify({"error": "File type not allowed"}), 400
+    
+    # Reject renamed files whose declared content type doesn't match
+    if file.mimetype not in ALLOWED_MIMETYPES:
+        return jsonify({"error": "File type not allowed"}), 400
+    
+    # Create uploads directory if it doesn't exist
+    upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
+    if not os.path.exists(upload_folder):
+        os.makedirs(upload_folder)
+    
+    # Generate unique filename
+    filename = secure_filename(file.filename)
+    unique_filename = f"{uuid.uuid4()}_{filename}"
+    file_path = os.path.join(upload_folder, unique_filename)
+    
+    # Save file
+    file.save(file_path)
+    
+    return jsonify({
+        "success": True,
+        "message": "File uploaded successfully",
+        "filename": unique_filename,
+        "file_path": file_path
+    }), 200
 
 # Dashboard Statistics
 @database_bp.route('/dashboard/stats', methods=['GET'])
@@ -491,31 +643,10 @@ def get_dashboard_stats():
     if not user:
         return jsonify({"error": "Unauthorized"}), 401
     
-    try:
-        total_patients = Patient.query.count()
-        total_reports = MedicalReport.query.count()
-        pending_reports = MedicalReport.query.filter_by(status='pending').count()
-        processed_reports = MedicalReport.query.filter_by(status='ai_processed').count()
-        reviewed_reports = MedicalReport.query.filter_by(status='doctor_reviewed').count()
-        
-        # Get recent patients
-        recent_patients = Patient.query.order_by(Patient.created_at.desc()).limit(5).all()
-        
-        # Get recent reports
-        recent_reports = MedicalReport.query.order_by(MedicalReport.created_at.desc()).limit(5).all()
-        
-        return jsonify({
-            "success": True,
-            "stats": {
-                "total_patients": total_patients,
-                "total_reports": total_reports,
-                "pending_reports": pending_reports,
-                "processed_reports": processed_reports,
-                "reviewed_reports": reviewed_reports
-            },
-            "recent_patients": [patient.to_dict() for patient in recent_patients],
-            "recent_reports": [report.to_dict() for report in recent_reports]
-        }), 200
-        
-    except Exception as e:
-        return jsonify({"error": f"Failed to fetch dashboard stats: {str(e)}"}), 500
+    payload = _dashboard_stats_payload()
+    return _json_with_etag(
+        {"success": True, **payload},
+        *payload['stats'].values(),
+        *(p['id'] for p in payload['recent_patients']),
+        *(r['updated_at'] for r in payload['recent_reports']),
+    )
@@ -13,7 +13,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app import app, db
 from models import User, Patient, PatientIntake, MedicalReport, PatientSession
-from werkzeug.security import generate_password_hash
+from passwords import hash_password
 
 def init_database():
     """Initialize the database with tables and sample data"""
@@ -33,7 +33,7 @@ def init_database():
         receptionist = User(
             email="receptionist@ras.com",
             full_name="Sarah Johnson",
-            password_hash=generate_password_hash("password123"),
+            password_hash=hash_password("password123"),
             role="receptionist",
             department="Reception",
             is_active=True
@@ -44,7 +44,7 @@ def init_database():
         doctor = User(
             email="doctor@ras.com",
             full_name="Dr. Michael Chen",
-            password_hash=generate_password_hash("password123"),
+            password_hash=hash_password("password123"),
             role="doctor",
             specialty="Radiology",
             department="Radiology",
@@ -52,7 +52,7 @@ def init_database():
         )
         db.session.add(doctor)
         
-        db.session.commit()
+        db.session.flush()  # Get the user IDs; everything is committed together below
         print("✓ Sample users created successfully")
         
         # Create sample patient
@@ -110,7 +110,11 @@ def init_database():
         )
         db.session.add(report)
         
-        db.session.commit()
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
         print("✓ Sample patient and intake data created successfully")
         
         print("\n🎉 Database initialization completed successfully!")
@@ -15,7 +15,10 @@ branch_labels = None
 depends_on = None
 
 def upgrade():
-    op.add_column('patient_intakes', sa.Column('high_priority', sa.Boolean(), nullable=True))
+    # server_default fills existing rows as part of the ADD COLUMN, no backfill UPDATE needed
+    with op.batch_alter_table('patient_intakes') as batch_op:
+        batch_op.add_column(sa.Column('high_priority', sa.Boolean(), nullable=True, server_default=sa.false()))
 
 def downgrade():
-    op.drop_column('patient_intakes', 'high_priority')
+    with op.batch_alter_table('patient_intakes') as batch_op:
+        batch_op.drop_column('high_priority')
@@ -14,9 +14,12 @@ branch_labels = None
 depends_on = None
 
 def upgrade():
-    op.add_column('patient_intakes', sa.Column('assigned_doctor_id', sa.Integer(), nullable=True))
-    op.create_foreign_key('fk_patient_intakes_assigned_doctor', 'patient_intakes', 'users', ['assigned_doctor_id'], ['id'])
+    # Batch mode so SQLite can apply the FK; other backends get plain ALTER TABLE
+    with op.batch_alter_table('patient_intakes') as batch_op:
+        batch_op.add_column(sa.Column('assigned_doctor_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_patient_intakes_assigned_doctor', 'users', ['assigned_doctor_id'], ['id'])
 
 def downgrade():
-    op.drop_constraint('fk_patient_intakes_assigned_doctor', 'patient_intakes', type_='foreignkey')
-    op.drop_column('patient_intakes', 'assigned_doctor_id')
+    with op.batch_alter_table('patient_intakes') as batch_op:
+        batch_op.drop_constraint('fk_patient_intakes_assigned_doctor', type_='foreignkey')
+        batch_op.drop_column('assigned_doctor_id')
@@ -0,0 +1,40 @@
+"""
+Revision ID: b4d81f6c3e27
+Revises: e5b7c2a94d10
+Create Date: 2025-09-04 09:30:00.000000
+
+Alembic migration script to index the foreign-key and filter columns used by the dashboards and doctor queues
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'b4d81f6c3e27'
+down_revision = 'e5b7c2a94d10'
+branch_labels = None
+depends_on = None
+
+# (table, column) pairs indexed with SQLAlchemy's default ix_<table>_<column> names
+SINGLE_COLUMN_INDEXES = [
+    ('users', 'role'),
+    ('users', 'is_active'),
+    ('patients', 'registered_by'),
+    ('patients', 'last_name'),
+    ('patient_intakes', 'assigned_doctor_id'),
+    ('patient_intakes', 'high_priority'),
+    ('medical_reports', 'patient_id'),
+    ('medical_reports', 'status'),
+    ('medical_reports', 'doctor_id'),
+    ('medical_reports', 'report_date'),
+    ('patient_sessions', 'patient_id'),
+    ('patient_sessions', 'session_date'),
+]
+
+def upgrade():
+    for table, column in SINGLE_COLUMN_INDEXES:
+        op.create_index(f'ix_{table}_{column}', table, [column])
+    op.create_index('ix_reports_status_doctor', 'medical_reports', ['status', 'doctor_id'])
+
+def downgrade():
+    op.drop_index('ix_reports_status_doctor', table_name='medical_reports')
+    for table, column in reversed(SINGLE_COLUMN_INDEXES):
+        op.drop_index(f'ix_{table}_{column}', table_name=table)
@@ -0,0 +1,35 @@
+"""
+Revision ID: c9e2f47a1d58
+Revises: b4d81f6c3e27
+Create Date: 2025-09-08 11:15:00.000000
+
+Alembic migration script to store extracted_data as jsonb and GIN-index the intake copy (PostgreSQL only)
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'c9e2f47a1d58'
+down_revision = 'b4d81f6c3e27'
+branch_labels = None
+depends_on = None
+
+TABLES = ('patient_intakes', 'medical_reports')
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table in TABLES:
+        op.alter_column(table, 'extracted_data', type_=postgresql.JSONB(), existing_nullable=True,
+                        postgresql_using='extracted_data::jsonb')
+    op.create_index('ix_intakes_extracted_gin', 'patient_intakes', ['extracted_data'],
+                    postgresql_using='gin', postgresql_ops={'extracted_data': 'jsonb_path_ops'})
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_intakes_extracted_gin', table_name='patient_intakes')
+    for table in reversed(TABLES):
+        op.alter_column(table, 'extracted_data', type_=sa.JSON(), existing_nullable=True,
+                        postgresql_using='extracted_data::json')
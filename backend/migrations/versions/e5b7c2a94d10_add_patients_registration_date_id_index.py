@@ -0,0 +1,20 @@
+"""
+Revision ID: e5b7c2a94d10
+Revises: abcd1234efgh
+Create Date: 2025-09-02 10:15:00.000000
+
+Alembic migration script to add the (registration_date, id) index used for keyset pagination of patients
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'e5b7c2a94d10'
+down_revision = 'abcd1234efgh'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_patients_registration_date_id', 'patients', ['registration_date', 'id'])
+
+def downgrade():
+    op.drop_index('ix_patients_registration_date_id', table_name='patients')
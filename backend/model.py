@@ -2,6 +2,7 @@
 # 1. Import Required Libraries
 #############################################
 import os
+import warnings
 import cv2
 import numpy as np
 import torch
@@ -12,6 +13,8 @@ import torchvision.transforms as transforms
 import tifffile as tiff  # For reading .tif images
 import matplotlib.pyplot as plt
 from torchvision import models
+from torchvision.models.resnet import Bottleneck
+from torch.nn.utils.fusion import fuse_conv_bn_eval
 
 #############################################
 # 2. Convert Bounding Box Text to Mask
@@ -26,26 +29,26 @@ def bbox_txt_to_mask(label_path, img_shape):
     h, w = img_shape[:2]
     mask = np.zeros((h, w), dtype=np.uint8)
 
-    with open(label_path, 'r') as f:
-        lines = f.readlines()
-
-    for line in lines:
-        parts = line.strip().split()
-        if len(parts) == 5:  # YOLO format
-            _, cx, cy, bw, bh = map(float, parts)
-            x_min = int((cx - bw / 2) * w)
-            y_min = int((cy - bh / 2) * h)
-            x_max = int((cx + bw / 2) * w)
-            y_max = int((cy + bh / 2) * h)
-        elif len(parts) == 4:  # Absolute format
-            x_min, y_min, x_max, y_max = map(int, parts)
-        else:
-            continue
-
-        # Clamp to image bounds
-        x_min, x_max = max(0, x_min), min(w, x_max)
-        y_min, y_max = max(0, y_min), min(h, y_max)
-
+    # Parse every box in one call; empty label files (no objects) are expected
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        boxes = np.loadtxt(label_path, ndmin=2)
+
+    if boxes.shape[1] == 5:  # YOLO format
+        cx, cy, bw, bh = boxes[:, 1], boxes[:, 2], boxes[:, 3], boxes[:, 4]
+        coords = np.stack([(cx - bw / 2) * w, (cy - bh / 2) * h,
+                           (cx + bw / 2) * w, (cy + bh / 2) * h], axis=1)
+    elif boxes.shape[1] == 4:  # Absolute format
+        coords = boxes
+    else:
+        return mask
+
+    # Truncate like int(), then clamp to image bounds
+    coords = coords.astype(np.int64)
+    np.clip(coords[:, 0::2], 0, w, out=coords[:, 0::2])
+    np.clip(coords[:, 1::2], 0, h, out=coords[:, 1::2])
+
+    for x_min, y_min, x_max, y_max in coords:
         mask[y_min:y_max, x_min:x_max] = 1
     return mask
 
@@ -69,10 +72,61 @@ class ConvBlock(nn.Module):
     def forward(self, x):
         return self.double_conv(x)
 
+def _match_size(x, ref):
+    """Resize x to ref's spatial size only when they differ; a no-op for inputs that are multiples of 32"""
+    if x.shape[2:] == ref.shape[2:]:
+        return x
+    return F.interpolate(x, size=ref.shape[2:])
+
+class Up(nn.Module):
+    """Upsample, add the encoder skip (ResNet-style) and refine with a ConvBlock"""
+    def __init__(self, in_channels, skip_channels, out_channels):
+        super().__init__()
+        # Nearest upsample + 3x3 conv instead of ConvTranspose2d: no checkerboard
+        # artifacts, and the BN folds away in fuse_for_inference()
+        self.up = nn.Sequential(
+            nn.Upsample(scale_factor=2, mode='nearest'),
+            nn.Conv2d(in_channels, skip_channels, 3, padding=1, bias=False),
+            nn.BatchNorm2d(skip_channels)
+        )
+        # Upsampled map already has skip_channels, so the skip is added as-is
+        # rather than concatenated; the ConvBlock reads half the channels
+        self.conv = ConvBlock(skip_channels, out_channels)
+
+    def forward(self, x, skip):
+        x = _match_size(self.up(x), skip)
+        return self.conv(x + skip)
+
+def _trimmed_backbone_path():
+    """Cache location (next to torchvision's hub checkpoints) for the headless ResNet50 weights"""
+    return os.path.join(torch.hub.get_dir(), "checkpoints", "resnet50_backbone_trimmed.pt")
+
+def build_trimmed_resnet50_state_dict(path=None):
+    """
+    Saves the ImageNet ResNet50 weights without the fc classifier head, the
+    only part ResUNet50 does not use, so later models load a smaller file
+    directly instead of rebuilding the full torchvision model.
+    """
+    path = path or _trimmed_backbone_path()
+    resnet = models.resnet50(pretrained=True)
+    state = {k: v for k, v in resnet.state_dict().items() if not k.startswith("fc.")}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    torch.save(state, path)
+    return path
+
 class ResUNet50(nn.Module):
     def __init__(self, out_channels=1, pretrained=True):
         super().__init__()
-        resnet = models.resnet50(pretrained=pretrained)
+        resnet = models.resnet50(pretrained=False)
+        # Classifier head is never used by the segmentation network
+        del resnet.fc, resnet.avgpool
+        if pretrained:
+            backbone_path = _trimmed_backbone_path()
+            if not os.path.exists(backbone_path):
+                build_trimmed_resnet50_state_dict(backbone_path)
+            state = torch.load(backbone_path, map_location="cpu", mmap=True, weights_only=True)
+            resnet.load_state_dict(state)
+            del state
 
         # Encoder
         self.input_layer = nn.Sequential(
@@ -83,25 +137,26 @@ class ResUNet50(nn.Module):
         self.encoder3 = resnet.layer3
         self.encoder4 = resnet.layer4
 
-        # Bottleneck
-        self.bottleneck = ConvBlock(2048, 1024)
+        # Bottleneck: 1x1 channel projection; the decoder does the spatial work
+        self.bottleneck = nn.Sequential(
+            nn.Conv2d(2048, 1024, 1, bias=False),
+            nn.BatchNorm2d(1024),
+            nn.ReLU(inplace=True)
+        )
 
         # Decoder
-        self.up4 = nn.ConvTranspose2d(1024, 1024, kernel_size=2, stride=2)
-        self.dec4 = ConvBlock(1024 + 1024, 1024)
-
-        self.up3 = nn.ConvTranspose2d(1024, 512, kernel_size=2, stride=2)
-        self.dec3 = ConvBlock(512 + 512, 512)
-
-        self.up2 = nn.ConvTranspose2d(512, 256, kernel_size=2, stride=2)
-        self.dec2 = ConvBlock(256 + 256, 256)
-
-        self.up1 = nn.ConvTranspose2d(256, 64, kernel_size=2, stride=2)
-        self.dec1 = ConvBlock(64 + 64, 64)
+        self.up4 = Up(1024, 1024, 1024)
+        self.up3 = Up(1024, 512, 512)
+        self.up2 = Up(512, 256, 256)
+        self.up1 = Up(256, 64, 64)
 
         self.final_conv = nn.Conv2d(64, out_channels, kernel_size=1)
 
     def forward(self, x):
+        """
+        Returns raw logits at the input resolution (no sigmoid), so training can
+        use the fused BCEWithLogitsLoss. Apply sigmoid at inference for probabilities.
+        """
         x1 = self.input_layer(x)
         x2 = self.encoder1(x1)
         x3 = self.encoder2(x2)
@@ -110,34 +165,69 @@ class ResUNet50(nn.Module):
 
         bottleneck = self.bottleneck(x5)
 
-        d4 = self.up4(bottleneck)
-        d4 = F.interpolate(d4, size=x4.shape[2:])
-        d4 = self.dec4(torch.cat([d4, x4], dim=1))
-
-        d3 = self.up3(d4)
-        d3 = F.interpolate(d3, size=x3.shape[2:])
-        d3 = self.dec3(torch.cat([d3, x3], dim=1))
-
-        d2 = self.up2(d3)
-        d2 = F.interpolate(d2, size=x2.shape[2:])
-        d2 = self.dec2(torch.cat([d2, x2], dim=1))
-
-        d1 = self.up1(d2)
-        d1 = F.interpolate(d1, size=x1.shape[2:])
-        d1 = self.dec1(torch.cat([d1, x1], dim=1))
+        d4 = self.up4(bottleneck, x4)
+        d3 = self.up3(d4, x3)
+        d2 = self.up2(d3, x2)
+        d1 = self.up1(d2, x1)
 
         out = self.final_conv(d1)
-        out = F.interpolate(out, size=x.shape[2:], mode="bilinear", align_corners=False)
+        if out.shape[2:] != x.shape[2:]:
+            out = F.interpolate(out, size=x.shape[2:], mode="bilinear", align_corners=False)
         return out
 
+    @torch.no_grad()
+    def fuse_for_inference(self):
+        """
+        Folds every BatchNorm into the Conv2d that feeds it (inference only).
+        Covers the encoder stem, the ResNet bottlenecks (including downsample)
+        and the decoder ConvBlocks. Fused BN layers become nn.Identity so the
+        module tree and forward() are unchanged. Call after model.eval().
+        """
+        if self.training:
+            raise RuntimeError("fuse_for_inference() requires the model to be in eval mode")
+
+        for module in list(self.modules()):
+            if isinstance(module, nn.Sequential):
+                for i in range(len(module) - 1):
+                    if isinstance(module[i], nn.Conv2d) and isinstance(module[i + 1], nn.BatchNorm2d):
+                        module[i] = fuse_conv_bn_eval(module[i], module[i + 1])
+                        module[i + 1] = nn.Identity()
+            elif isinstance(module, Bottleneck):
+                for n in (1, 2, 3):
+                    conv, bn = getattr(module, f"conv{n}"), getattr(module, f"bn{n}")
+                    if isinstance(bn, nn.BatchNorm2d):
+                        setattr(module, f"conv{n}", fuse_conv_bn_eval(conv, bn))
+                        setattr(module, f"bn{n}", nn.Identity())
+        return self
+
+def export_onnx(model, out_path, img_size=256):
+    """
+    Exports the model (logits output, dynamic batch) for onnxruntime or
+    TensorRT serving. Constant folding bakes eval-mode BatchNorm into the convs.
+    """
+    model.eval()
+    dummy = torch.randn(1, 3, img_size, img_size, device=next(model.parameters()).device)
+    torch.onnx.export(
+        model, dummy, out_path,
+        opset_version=17,
+        do_constant_folding=True,
+        input_names=['x'],
+        output_names=['mask'],
+        dynamic_axes={'x': {0: 'B'}, 'mask': {0: 'B'}}
+    )
+    return out_path
+
 #############################################
 # 4. Custom Dataset for TIFF Files
 #############################################
 class SegmentationDatasetTIF(Dataset):
-    def __init__(self, image_dir, label_dir, target_size=(256, 256)):
+    def __init__(self, image_dir, label_dir, target_size=(256, 256), cache_dir=None, raw=False):
         self.image_dir = image_dir
         self.label_dir = label_dir
         self.target_size = target_size
+        # raw=True yields unresized uint8 tensors; train_unet(resize_to=...) then
+        # scales and resizes the whole batch on the device with resize_batch()
+        self.raw = raw
 
         self.image_files = sorted([f for f in os.listdir(image_dir) if f.endswith('.tif')])
 
@@ -152,10 +242,65 @@ class SegmentationDatasetTIF(Dataset):
         if not self.image_files:
             raise ValueError("No matching images and labels found!")
 
+        # Optional pre-decoded uint8 cache; arrays are mapped lazily so each
+        # DataLoader worker opens its own view instead of pickling the data
+        self.cache_dir = None
+        self._images = self._masks = None
+        if cache_dir is not None:
+            if raw:
+                raise ValueError("cache_dir stores resized samples and cannot be combined with raw=True")
+            if not os.path.exists(os.path.join(cache_dir, 'images.npy')):
+                self.build_cache(cache_dir)
+            self.cache_dir = cache_dir
+
     def __len__(self):
         return len(self.image_files)
 
+    def build_cache(self, cache_dir):
+        """
+        Decodes and resizes every sample once into uint8 arrays
+        images.npy (N,3,H,W) and masks.npy (N,1,H,W) under cache_dir,
+        so later epochs read from a memory map instead of decoding TIFFs.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        n = len(self.image_files)
+        w, h = self.target_size
+        images = np.lib.format.open_memmap(os.path.join(cache_dir, 'images.npy'), mode='w+', dtype=np.uint8, shape=(n, 3, h, w))
+        masks = np.lib.format.open_memmap(os.path.join(cache_dir, 'masks.npy'), mode='w+', dtype=np.uint8, shape=(n, 1, h, w))
+        for idx in range(n):
+            images[idx], masks[idx] = self._load_sample(idx)
+        images.flush()
+        masks.flush()
+        del images, masks
+
+        self.cache_dir = cache_dir
+        self._images = self._masks = None
+
+    def _cached_arrays(self):
+        if self._images is None:
+            # Copy-on-write map: writable views for torch.from_numpy, file never modified
+            self._images = np.load(os.path.join(self.cache_dir, 'images.npy'), mmap_mode='c')
+            self._masks = np.load(os.path.join(self.cache_dir, 'masks.npy'), mmap_mode='c')
+            if len(self._images) != len(self.image_files):
+                raise ValueError(f"Stale dataset cache in {self.cache_dir}; delete it to rebuild")
+        return self._images, self._masks
+
     def __getitem__(self, idx):
+        if self.cache_dir is not None:
+            images, masks = self._cached_arrays()
+            image, mask = images[idx], masks[idx]
+        else:
+            image, mask = self._load_sample(idx)
+
+        if self.raw:
+            return torch.from_numpy(image), torch.from_numpy(mask)
+
+        image = torch.from_numpy(image).float().mul_(1.0 / 255.0)
+        mask = torch.from_numpy(mask).float().mul_(1.0 / 255.0)
+        return image, mask
+
+    def _load_sample(self, idx):
+        """Reads one image/label pair as uint8 arrays: image (3,H,W), mask (1,H,W)"""
         image_filename = self.image_files[idx]
         image_path = os.path.join(self.image_dir, image_filename)
         image = tiff.imread(image_path)
@@ -163,40 +308,64 @@ class SegmentationDatasetTIF(Dataset):
         if len(image.shape) == 2:
             image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
 
-        image = cv2.resize(image, self.target_size).astype(np.float32) / 255.0
-        image = torch.tensor(image).permute(2, 0, 1)
+        # Resize while still uint8; a contiguous CHW array goes to torch without copying
+        if not self.raw:
+            image = cv2.resize(image, self.target_size, interpolation=cv2.INTER_AREA)
+        image_hw = image.shape[:2]
+        image = np.ascontiguousarray(image.transpose(2, 0, 1))
 
         base_name = image_filename.replace('.tif', '')
         label_filename = self.label_map[base_name]
         label_path = os.path.join(self.label_dir, label_filename)
 
         if label_filename.endswith('.txt'):
-            mask = bbox_txt_to_mask(label_path, image.shape[1:])
+            mask = bbox_txt_to_mask(label_path, image_hw)
         else:
             mask = tiff.imread(label_path)
 
-        mask = cv2.resize(mask, self.target_size, interpolation=cv2.INTER_NEAREST)
-        mask = torch.tensor(mask, dtype=torch.float32).unsqueeze(0) / 255.0
+        if not self.raw:
+            mask = cv2.resize(mask, self.target_size, interpolation=cv2.INTER_NEAREST)
+        return image, mask[None]
 
-        return image, mask
+def resize_batch(images, masks, size):
+    """
+    Scales a raw uint8 batch to [0, 1] and resizes it to size (H, W) where it
+    lives: bilinear for images, nearest for masks, one kernel per tensor.
+    """
+    images = F.interpolate(images.float().div_(255.0), size=size, mode="bilinear", align_corners=False, antialias=True)
+    masks = F.interpolate(masks.float().div_(255.0), size=size, mode="nearest")
+    return images, masks
 
 #############################################
 # 5. Training Loop
 #############################################
-def train_unet(model, dataloader, criterion, optimizer, device, num_epochs=10):
-    model.to(device)
+def train_unet(model, dataloader, criterion, optimizer, device, num_epochs=10, resize_to=None):
+    # NHWC lets cuDNN/oneDNN pick their faster conv kernels; the math is unchanged
+    model.to(device, memory_format=torch.channels_last)
     model.train()
+
+    # Mixed precision on CUDA; on CPU autocast and the scaler are no-ops
+    use_amp = device.type == "cuda"
+    scaler = torch.cuda.amp.GradScaler(enabled=use_amp)
+
     for epoch in range(num_epochs):
         epoch_loss = 0.0
         for images, masks in dataloader:
-            images = images.to(device)
-            masks = masks.to(device)
+            images = images.to(device, non_blocking=True)
+            masks = masks.to(device, non_blocking=True)
+            if resize_to is not None:
+                # Batches from a raw=True dataset: uint8 over the bus, resized on the device
+                images, masks = resize_batch(images, masks, resize_to)
+            images = images.contiguous(memory_format=torch.channels_last)
 
             optimizer.zero_grad()
-            outputs = model(images)
-            loss = criterion(outputs, masks)
-            loss.backward()
-            optimizer.step()
+            # Model returns logits, so BCEWithLogitsLoss stays numerically safe under fp16
+            with torch.autocast(device_type=device.type, dtype=torch.float16, enabled=use_amp):
+                outputs = model(images)
+                loss = criterion(outputs, masks)
+            scaler.scale(loss).backward()
+            scaler.step(optimizer)
+            scaler.update()
             epoch_loss += loss.item()
 
         print(f"Epoch [{epoch+1}/{num_epochs}], Loss: {epoch_loss/len(dataloader):.4f}")
@@ -205,18 +374,43 @@ def train_unet(model, dataloader, criterion, optimizer, device, num_epochs=10):
 # 6. Train the Model
 #############################################
 if __name__ == "__main__":
+    # Input shapes are fixed, so let cuDNN benchmark conv algorithms once; allow TF32 matmuls
+    torch.backends.cudnn.benchmark = True
+    torch.set_float32_matmul_precision('high')
+
     train_image_dir = r"D:\projects\radiologist assistant system\TCGA_CS_4941_19960909-20250715T091155Z-1-001\TCGA_CS_4941_19960909\normal"
     train_label_dir = r"D:\projects\radiologist assistant system\TCGA_CS_4941_19960909-20250715T091155Z-1-001\TCGA_CS_4941_19960909\mask"
 
-    train_dataset = SegmentationDatasetTIF(train_image_dir, train_label_dir)
-    train_loader = DataLoader(train_dataset, batch_size=4, shuffle=True, num_workers=2)
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+    # First run decodes the TIFFs into tif_cache/; later runs train straight from the memory map
+    train_dataset = SegmentationDatasetTIF(train_image_dir, train_label_dir, cache_dir="tif_cache")
+    train_loader = DataLoader(
+        train_dataset,
+        batch_size=4,
+        shuffle=True,
+        num_workers=max(1, (os.cpu_count() or 2) // 2),
+        persistent_workers=True,
+        pin_memory=device.type == "cuda",  # lets non_blocking H2D copies overlap compute
+        prefetch_factor=4,
+    )
 
     model = ResUNet50(out_channels=1, pretrained=False)
     criterion = nn.BCEWithLogitsLoss()
     optimizer = torch.optim.Adam(model.parameters(), lr=1e-4)
 
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    train_unet(model, train_loader, criterion, optimizer, device, num_epochs=10)
+    # Inductor fuses the BN/ReLU/add tails into generated kernels; input shapes are static.
+    # The compiled wrapper shares parameters with model, so the checkpoint is saved from model.
+    train_model = model
+    if device.type == "cuda":
+        torch._dynamo.config.cache_size_limit = 16
+        train_model = torch.compile(model, mode="max-autotune", fullgraph=False)
+
+    train_unet(train_model, train_loader, criterion, optimizer, device, num_epochs=10)
 
     torch.save(model.state_dict(), "resunet50_brain_segmentation.pth")
     print("✅ Model saved after training.")
+
+    # Fixed-shape graph for deployment; pass this path as model_path to /segment
+    export_onnx(model, "resunet50_brain_segmentation.onnx")
+    print("✅ ONNX model exported.")
@@ -1,9 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects import postgresql
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from passwords import hash_password, verify_password
 
 db = SQLAlchemy()
 
+# Binary JSON on PostgreSQL (pre-parsed, GIN-indexable); plain JSON elsewhere
+JSONB = db.JSON().with_variant(postgresql.JSONB(), 'postgresql')
+
 class User(db.Model):
     __tablename__ = 'users'
     
@@ -11,18 +15,18 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     full_name = db.Column(db.String(200), nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
-    role = db.Column(db.String(20), nullable=False)  # 'doctor' or 'receptionist'
+    role = db.Column(db.String(20), nullable=False, index=True)  # 'doctor' or 'receptionist'
     specialty = db.Column(db.String(100), nullable=True)  # For doctors
     department = db.Column(db.String(100), nullable=True)
-    is_active = db.Column(db.Boolean, default=True)
+    is_active = db.Column(db.Boolean, default=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
     
     def to_dict(self):
         return {
@@ -33,17 +37,21 @@ class User(db.Model):
             'specialty': self.specialty,
             'department': self.department,
             'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
 class Patient(db.Model):
     __tablename__ = 'patients'
+    __table_args__ = (
+        # Serves newest-first keyset pagination in GET /api/patients
+        db.Index('ix_patients_registration_date_id', 'registration_date', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     patient_id = db.Column(db.String(50), unique=True, nullable=False)  # Custom patient ID
     first_name = db.Column(db.String(100), nullable=False)
-    last_name = db.Column(db.String(100), nullable=False)
+    last_name = db.Column(db.String(100), nullable=False, index=True)
     date_of_birth = db.Column(db.Date, nullable=False)
     gender = db.Column(db.String(10), nullable=False)
     phone = db.Column(db.String(20), nullable=True)
@@ -58,12 +66,12 @@ class Patient(db.Model):
     family_history = db.Column(db.Text, nullable=True)
     
     # Registration Details
-    registered_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    registered_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     registration_date = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    registered_by_user = db.relationship('User', backref='registered_patients')
+    registered_by_user = db.relationship('User', backref=db.backref('registered_patients', lazy='raise'))
     medical_reports = db.relationship('MedicalReport', backref='patient', lazy=True)
     intake_records = db.relationship('PatientIntake', backref='patient', lazy=True)
     
@@ -74,7 +82,7 @@ class Patient(db.Model):
             'first_name': self.first_name,
             'last_name': self.last_name,
             'full_name': f"{self.first_name} {self.last_name}",
-            'date_of_birth': self.date_of_birth.isoformat() if self.date_of_birth else None,
+            'date_of_birth': self.date_of_birth,
             'gender': self.gender,
             'phone': self.phone,
             'email': self.email,
@@ -85,12 +93,17 @@ class Patient(db.Model):
             'current_medications': self.current_medications,
             'family_history': self.family_history,
             'registered_by': self.registered_by,
-            'registration_date': self.registration_date.isoformat() if self.registration_date else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'registration_date': self.registration_date,
+            'updated_at': self.updated_at
         }
 
 class PatientIntake(db.Model):
     __tablename__ = 'patient_intakes'
+    __table_args__ = (
+        # Containment/key lookups on the extracted PDF fields (@>, ?); PostgreSQL only
+        db.Index('ix_intakes_extracted_gin', 'extracted_data', postgresql_using='gin',
+                 postgresql_ops={'extracted_data': 'jsonb_path_ops'}).ddl_if(dialect='postgresql'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     patient_id = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False)
@@ -116,20 +129,20 @@ class PatientIntake(db.Model):
     
     # File Information
     previous_report_pdf = db.Column(db.String(500), nullable=True)  # Path to uploaded PDF
-    extracted_data = db.Column(db.JSON, nullable=True)  # Store extracted PDF data
+    extracted_data = db.Column(JSONB, nullable=True)  # Store extracted PDF data
     
     # Assignment
-    assigned_doctor_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    assigned_doctor_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
     
     # High Priority Flag
-    high_priority = db.Column(db.Boolean, nullable=True)
+    high_priority = db.Column(db.Boolean, nullable=True, server_default=db.false(), index=True)
     # Session Information
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    created_by_user = db.relationship('User', backref='created_intakes', foreign_keys=[created_by])
+    created_by_user = db.relationship('User', backref=db.backref('created_intakes', lazy='raise'), foreign_keys=[created_by])
     
     def to_dict(self):
         return {
@@ -138,7 +151,7 @@ class PatientIntake(db.Model):
             'age': self.age,
             'assigned_doctor_id': self.assigned_doctor_id,
             'sex': self.sex,
-            'dob': self.dob.isoformat() if self.dob else None,
+            'dob': self.dob,
             'contact_number': self.contact_number,
             'abha_id': self.abha_id,
             'previous_condition': self.previous_condition,
@@ -154,21 +167,25 @@ class PatientIntake(db.Model):
             'previous_report_pdf': self.previous_report_pdf,
             'extracted_data': self.extracted_data,
             'created_by': self.created_by,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'high_priority': self.high_priority
         }
 
 class MedicalReport(db.Model):
     __tablename__ = 'medical_reports'
+    __table_args__ = (
+        # Serves "reports with status X for doctor Y" from one index range scan
+        db.Index('ix_reports_status_doctor', 'status', 'doctor_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     report_id = db.Column(db.String(50), unique=True, nullable=False)  # Custom report ID
-    patient_id = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False)
+    patient_id = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False, index=True)
     
     # Report Details
     report_type = db.Column(db.String(100), nullable=False)  # e.g., 'X-Ray', 'MRI', 'CT Scan'
-    report_date = db.Column(db.DateTime, default=datetime.utcnow)
+    report_date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     referring_physician = db.Column(db.String(200), nullable=True)
     chief_complaint = db.Column(db.Text, nullable=True)
     
@@ -178,22 +195,22 @@ class MedicalReport(db.Model):
     segmentation_image_path = db.Column(db.String(500), nullable=True)
     
     # Doctor's Review
-    doctor_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    doctor_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
     doctor_review = db.Column(db.Text, nullable=True)
     is_edited = db.Column(db.Boolean, default=False)
     edited_at = db.Column(db.DateTime, nullable=True)
     
     # File Information
     original_pdf_path = db.Column(db.String(500), nullable=True)
-    extracted_data = db.Column(db.JSON, nullable=True)  # Store extracted PDF data
+    extracted_data = db.Column(JSONB, nullable=True)  # Store extracted PDF data
     
     # Status
-    status = db.Column(db.String(20), default='pending')  # 'pending', 'ai_processed', 'doctor_reviewed'
+    status = db.Column(db.String(20), default='pending', index=True)  # 'pending', 'ai_processed', 'doctor_reviewed'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    doctor = db.relationship('User', backref='reviewed_reports')
+    doctor = db.relationship('User', backref=db.backref('reviewed_reports', lazy='raise'))
     
     def to_dict(self):
         return {
@@ -201,7 +218,7 @@ class MedicalReport(db.Model):
             'report_id': self.report_id,
             'patient_id': self.patient_id,
             'report_type': self.report_type,
-            'report_date': self.report_date.isoformat() if self.report_date else None,
+            'report_date': self.report_date,
             'referring_physician': self.referring_physician,
             'chief_complaint': self.chief_complaint,
             'ai_generated_report': self.ai_generated_report,
@@ -210,20 +227,20 @@ class MedicalReport(db.Model):
             'doctor_id': self.doctor_id,
             'doctor_review': self.doctor_review,
             'is_edited': self.is_edited,
-            'edited_at': self.edited_at.isoformat() if self.edited_at else None,
+            'edited_at': self.edited_at,
             'original_pdf_path': self.original_pdf_path,
             'extracted_data': self.extracted_data,
             'status': self.status,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
 class PatientSession(db.Model):
     __tablename__ = 'patient_sessions'
     
     id = db.Column(db.Integer, primary_key=True)
-    patient_id = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False)
-    session_date = db.Column(db.DateTime, default=datetime.utcnow)
+    patient_id = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False, index=True)
+    session_date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     session_type = db.Column(db.String(100), nullable=False)  # 'intake', 'consultation', 'follow_up'
     notes = db.Column(db.Text, nullable=True)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -231,15 +248,15 @@ class PatientSession(db.Model):
     
     # Relationships
     patient = db.relationship('Patient', backref='sessions')
-    created_by_user = db.relationship('User', backref='created_sessions')
+    created_by_user = db.relationship('User', backref=db.backref('created_sessions', lazy='raise'))
     
     def to_dict(self):
         return {
             'id': self.id,
             'patient_id': self.patient_id,
-            'session_date': self.session_date.isoformat() if self.session_date else None,
+            'session_date': self.session_date,
             'session_type': self.session_type,
             'notes': self.notes,
             'created_by': self.created_by,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
@@ -0,0 +1,28 @@
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from werkzeug.security import check_password_hash
+
+# argon2id with a 64 MiB memory cost; verification takes a few ms instead of
+# the ~600k pbkdf2 iterations Werkzeug uses by default.
+_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=2)
+
+# Hash prefixes written by werkzeug.security.generate_password_hash
+LEGACY_HASH_PREFIXES = ("pbkdf2:", "scrypt:")
+
+
+def hash_password(password: str) -> str:
+    return _hasher.hash(password)
+
+
+def is_legacy_hash(password_hash: str) -> bool:
+    return password_hash.startswith(LEGACY_HASH_PREFIXES)
+
+
+def verify_password(password_hash: str, password: str) -> bool:
+    """Check a password against an argon2 hash or a legacy Werkzeug hash."""
+    if is_legacy_hash(password_hash):
+        return check_password_hash(password_hash, password)
+    try:
+        return _hasher.verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
@@ -1,14 +1,243 @@
 import fitz
 import json
-from collections import defaultdict
+import bisect
+import hashlib
+import multiprocessing
+import os
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice, repeat
+from collections import OrderedDict, defaultdict
 import re
 import io
 import base64
+import numpy as np
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional; fall back to substring checks
+    ahocorasick = None
+
+try:
+    import xxhash
+except ImportError:  # xxhash is optional; fall back to blake2b content keys
+    xxhash = None
+
+# --- Compiled Patterns ---
+# Compiled once at import; the extraction loops below run these per line and per field.
+# Bullets first (a single character-class test), then enumerators and section words.
+# The leading \s* replaces a strip() of the line; no capturing groups are needed.
+_SPECIAL_PREFIX_RE = re.compile(
+    r"\s*(?:[-–•:]|(?:\d+[.)])+|[IVXLCDM]+\.|[A-Z]\.|(?:Section|Chapter|Article)\b)",
+    re.IGNORECASE
+)
+
+_NAME_RES = [re.compile(p, re.MULTILINE) for p in (
+    r"Patient:\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",
+    r"Name:\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",
+    r"Patient Name:\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",
+    r"^([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s*$"  # Standalone names
+)]
+
+# (?<!\d) starts the bare-number patterns only at the first digit of a run. A
+# leftmost match always starts there anyway, but without the guard a long digit
+# run (table of IDs, barcode text) is retried from every digit: quadratic time.
+_AGE_RES = [re.compile(p, re.IGNORECASE) for p in (
+    r"Age:\s*(\d+)",
+    r"(?<!\d)(\d+)\s*years?\s*old",
+    r"Age\s*(\d+)",
+    r"(?<!\d)(\d+)\s*Y\/O"
+)]
+
+_SEX_RES = [re.compile(p, re.IGNORECASE) for p in (
+    r"Sex:\s*(Male|Female|M|F)",
+    r"Gender:\s*(Male|Female|M|F)",
+    r"(Male|Female|M|F)\s*$"
+)]
+
+# Groups are (month, day, year); a labelled DOB wins over the first bare date
+_DOB_RES = [re.compile(p) for p in (
+    r"DOB:\s*(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})",
+    r"Date of Birth:\s*(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})",
+    r"Birth Date:\s*(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})",
+    r"(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})"
+)]
+
+_PHONE_RES = [re.compile(p) for p in (
+    r"Phone:\s*([\d\-\+\(\)\s]+)",
+    r"Contact:\s*([\d\-\+\(\)\s]+)",
+    r"Mobile:\s*([\d\-\+\(\)\s]+)",
+    r"(\d{3}[-.\s]?\d{3}[-.\s]?\d{4})"
+)]
+
+_ID_RES = [re.compile(p) for p in (
+    r"Patient ID:\s*([A-Za-z0-9\-_]+)",
+    r"ID:\s*([A-Za-z0-9\-_]+)",
+    r"Patient Number:\s*([A-Za-z0-9\-_]+)"
+)]
+
+# Labelled only; unlabelled ABHA numbers are found by _abha_number_token()
+_ABHA_RES = [re.compile(p) for p in (
+    r"ABHA ID:\s*([A-Za-z0-9\-_]+)",
+    r"ABHA:\s*([A-Za-z0-9\-_]+)"
+)]
+
+# get_text("dict") flags without TEXT_PRESERVE_IMAGES: image blocks are skipped
+# below anyway, and extracting them copies every embedded image's bytes
+_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+# PageLines.flags bits; at most one of the three case bits is set (none means MIXED)
+LINE_BOLD = 1
+LINE_ITALIC = 2
+LINE_CENTERED = 4
+LINE_SPECIAL_PREFIX = 8
+LINE_UPPER = 16
+LINE_TITLE = 32
+LINE_LOWER = 64
+_CASE_FLAGS = {"UPPER": LINE_UPPER, "TITLE": LINE_TITLE, "LOWER": LINE_LOWER, "MIXED": 0}
+
+# Parsing strategy thresholds (see extract_pdf_lines_cleaned_and_merged)
+_RULES = {
+    "sequential_max_pages": 200,  # at or below this, parse in-process
+    "min_pages_per_worker": 50,   # never give a pool worker fewer pages than this
+    "cache_size": 32,             # parsed documents kept, keyed by content hash
+    "fields_cache_size": 128,     # extracted field dicts kept, keyed by content hash
+}
+
+class _ContentCache:
+    """Small thread-safe LRU keyed by a digest of the PDF bytes."""
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+# Re-uploads of the same report (preview, submit, reprocess) skip the parse,
+# and usually the field extraction as well
+_parsed_cache = _ContentCache(_RULES["cache_size"])
+_fields_cache = _ContentCache(_RULES["fields_cache_size"])
+
+def _content_key(pdf_bytes):
+    """128-bit digest of the PDF bytes; xxh128 when available (sub-ms for a few MB)."""
+    if xxhash is not None:
+        return xxhash.xxh128_digest(pdf_bytes)
+    return hashlib.blake2b(pdf_bytes, digest_size=16).digest()
+
+# Field -> patterns in priority order (DOB is handled separately for reformatting)
+_DEMOGRAPHIC_FIELD_RES = (
+    ("patientName", _NAME_RES),
+    ("age", _AGE_RES),
+    ("sex", _SEX_RES),
+    ("contactNumber", _PHONE_RES),
+    ("patientId", _ID_RES),
+    ("abhaId", _ABHA_RES),
+)
+
+# Section keywords for the free-text medical fields, in priority order per field
+_MEDICAL_SECTIONS = {
+    "previousCondition": ["Previous", "History", "Past Medical"],
+    "currentMedication": ["Medication", "Drugs", "Current Treatment"],
+    "familyHistory": ["Family", "Genetic", "Hereditary"],
+    "knownAllergy": ["Allergy", "Allergic", "Sensitivity"],
+    "chiefComplaint": ["Chief Complaint", "Main Symptom", "Primary Concern"],
+    "referringDoctor": ["Referring", "Referred by", "Doctor"],
+    "neurologicalSymptom": ["Neurological", "Neurologic", "Brain", "Nerve"],
+    "treatmentHistory": ["Treatment", "Therapy", "Intervention"],
+    "symptomProgression": ["Progression", "Worsening", "Improvement"]
+}
+
+def _build_keyword_automaton():
+    """Aho-Corasick automaton mapping each lowercased keyword to its (field, rank) entries."""
+    entries = defaultdict(list)
+    for field, keywords in _MEDICAL_SECTIONS.items():
+        for rank, keyword in enumerate(keywords):
+            entries[keyword.lower()].append((field, rank))
+    automaton = ahocorasick.Automaton()
+    for keyword, value in entries.items():
+        automaton.add_word(keyword, value)
+    automaton.make_automaton()
+    return automaton
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton() if ahocorasick is not None else None
+
+def _section_keyword_hits(text_lower):
+    """
+    Maps each medical field whose keywords occur in the (lowercased) line
+    to the index of the first of its keywords that occurs.
+    """
+    hits = {}
+    if _KEYWORD_AUTOMATON is not None:
+        for _, entries in _KEYWORD_AUTOMATON.iter(text_lower):
+            for field, rank in entries:
+                if rank < hits.get(field, rank + 1):
+                    hits[field] = rank
+        return hits
+    for field, keywords in _MEDICAL_SECTIONS.items():
+        for rank, keyword in enumerate(keywords):
+            if keyword.lower() in text_lower:
+                hits[field] = rank
+                break
+    return hits
+
+def _section_snippets(pages_data, page_hits, field, keywords):
+    """Yields, in document order, the text found for one medical field."""
+    for page, line_hits in zip(pages_data, page_hits):
+        texts, ys = page.texts, page.ys
+        for line_idx, hits in enumerate(line_hits):
+            # Check if line contains relevant keywords
+            rank = hits.get(field)
+            if rank is None:
+                continue
+            # Extract text after the first listed keyword present
+            parts = texts[line_idx].split(keywords[rank], 1)
+            if len(parts) > 1 and parts[1].strip():
+                yield parts[1].strip()
+            
+            # Also check next few lines for additional content; ys is
+            # ascending, so the look-ahead window is a bisect slice
+            current_y = ys[line_idx]
+            start = bisect.bisect_right(ys, current_y)
+            end = bisect.bisect_right(ys, current_y + 50)  # Within 50 units
+            for i in range(start, end):
+                if texts[i].strip() and field not in line_hits[i]:
+                    yield texts[i].strip()
 
 # --- Helper Functions ---
+# Sizes and font names repeat across nearly every span of a document
+@lru_cache(maxsize=256)
 def normalize_font_size(size):
     return round(size, 1) if size else None
 
+@lru_cache(maxsize=64)
+def _font_flags(font_name):
+    """LINE_BOLD / LINE_ITALIC bits for a font name such as 'Helvetica-BoldOblique'."""
+    flags = 0
+    if "Bold" in font_name:
+        flags |= LINE_BOLD
+    if "Italic" in font_name or "Oblique" in font_name:
+        flags |= LINE_ITALIC
+    return flags
+
 def round_coord(value, precision=1):
     return round(value, precision) if value is not None else None
 
@@ -23,20 +252,165 @@ def detect_line_case(text):
         return "MIXED"
 
 def has_special_prefix(text):
-    text = text.strip()
-    patterns = [
-        r"^(\d+[\.\)])+",
-        r"^[IVXLCDM]+\.",
-        r"^[A-Z]\.",
-        r"^[-–•:]",
-        r"^(Section|Chapter|Article)\b"
-    ]
-    return any(re.match(p, text, re.IGNORECASE) for p in patterns)
+    return _SPECIAL_PREFIX_RE.match(text) is not None
+
+def _first_search(patterns, text):
+    """Match object of the first pattern that matches anywhere in text, or None."""
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return match
+    return None
+
+def _first_match(patterns, text):
+    """Group 1 of the first pattern that matches anywhere in text, or None."""
+    match = _first_search(patterns, text)
+    return match.group(1) if match else None
+
+def _abha_number_token(text):
+    """First whitespace-separated token shaped like a 14-digit ABHA number (e.g. 91-1234-5678-9012), or None."""
+    for token in text.split():
+        token = token.strip(".,;:()[]")
+        digits = token.replace("-", "")
+        if len(digits) == 14 and digits.isascii() and digits.isdigit():
+            return token
+    return None
 
 def is_centered(x, page_width=595.0, tolerance=50):
     center = page_width / 2
     return abs(x - center) < tolerance
 
+def centered_mask(xs, page_width=595.0, tolerance=50):
+    """is_centered() over an array of x positions at once."""
+    return np.abs(np.asarray(xs) - page_width / 2) < tolerance
+
+@dataclass
+class PageLines:
+    """
+    Merged lines of one page as parallel lists (structure of arrays), in
+    ascending y order. The extraction loops index these directly; to_dicts()
+    builds the per-line dicts returned by extract_pdf_lines_cleaned_and_merged.
+    Style, layout and case are packed into one uint8 of LINE_* bits per line.
+    """
+    page_number: int
+    texts: list = field(default_factory=list)
+    texts_lower: list = field(default_factory=list)
+    xs: list = field(default_factory=list)
+    ys: list = field(default_factory=list)
+    font_sizes: list = field(default_factory=list)
+    font_names: list = field(default_factory=list)
+    flags: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.uint8))
+
+    def __len__(self):
+        return len(self.texts)
+
+    def to_dicts(self):
+        lines = []
+        for i, flags in enumerate(self.flags.tolist()):
+            if flags & LINE_UPPER:
+                line_case = "UPPER"
+            elif flags & LINE_TITLE:
+                line_case = "TITLE"
+            elif flags & LINE_LOWER:
+                line_case = "LOWER"
+            else:
+                line_case = "MIXED"
+            lines.append({
+                "text": self.texts[i],
+                "font_size": self.font_sizes[i],
+                "font_name": self.font_names[i],
+                "bold": bool(flags & LINE_BOLD),
+                "italic": bool(flags & LINE_ITALIC),
+                "position_x": self.xs[i],
+                "position_y": self.ys[i],
+                "page_number": self.page_number,
+                "line_length": len(self.texts[i]),
+                "is_centered": bool(flags & LINE_CENTERED),
+                "line_case": line_case,
+                "has_special_prefix": bool(flags & LINE_SPECIAL_PREFIX)
+            })
+        return lines
+
+def _parse_page(page, page_num):
+    """Merged lines of one page as PageLines, or None if its text cannot be extracted."""
+    try:
+        blocks = page.get_text("dict", flags=_TEXT_FLAGS)["blocks"]
+    except Exception:
+        return None # Skip page if text extraction fails
+
+    # Span attributes as parallel lists; grouped into lines with one NumPy sort below
+    texts, sizes, fonts, styles, xs, ys = [], [], [], [], [], []
+    # (text, x, y) of spans already taken; PyMuPDF emits fake-bold text as the
+    # same span drawn twice at one position
+    seen = set()
+    for block in blocks:
+        if block.get('type') != 0:
+            continue
+        for line in block.get("lines", []):
+            for span in line.get("spans", []):
+                raw = span.get("text")
+                if not raw or raw.isspace():
+                    continue
+                text = raw.strip()
+                bbox = span["bbox"]
+                x, y = round(bbox[0], 1), round(bbox[1], 1)
+                sig = (text, x, y)
+                if sig in seen:
+                    continue
+                seen.add(sig)
+
+                size = normalize_font_size(span.get("size"))
+                texts.append(text)
+                sizes.append(np.nan if size is None else size)
+                fonts.append(span.get("font"))
+                styles.append(_font_flags(span.get("font", "")))
+                xs.append(x)
+                ys.append(y)
+
+    page_lines = PageLines(page_number=page_num + 1)
+    if texts:
+        # Order spans by (y, x); lexsort is stable, so equal positions keep reading order
+        x_arr = np.asarray(xs)
+        order = np.lexsort((x_arr, np.asarray(ys)))
+        line_ys, starts = np.unique(np.asarray(ys)[order], return_index=True)
+        # Per-line reductions for the whole page, one vector op each: left edge,
+        # largest font size (fmax skips the NaNs of size-less spans) and the
+        # OR of the span style bits
+        line_xs = np.minimum.reduceat(x_arr[order], starts)
+        line_sizes = np.fmax.reduceat(np.asarray(sizes)[order], starts)
+        line_flags = np.bitwise_or.reduceat(np.asarray(styles, dtype=np.uint8)[order], starts)
+        line_flags[centered_mask(line_xs)] |= LINE_CENTERED
+        page_lines.xs = line_xs.tolist()
+        page_lines.ys = line_ys.tolist()
+        page_lines.font_sizes = [None if size != size else size for size in line_sizes.tolist()]
+        
+        # Text merging and the string classifiers stay per line. Texts and fonts
+        # are put in line order once, so each line is a plain slice of them.
+        bounds = starts.tolist() + [len(order)]
+        order = order.tolist()
+        texts = [texts[i] for i in order]
+        fonts = [fonts[i] for i in order]
+        for line_idx in range(len(bounds) - 1):
+            start, stop = bounds[line_idx], bounds[line_idx + 1]
+            merged_text = " ".join(texts[start:stop])
+            page_lines.texts.append(merged_text)
+            page_lines.texts_lower.append(merged_text.lower())
+            page_lines.font_names.append(next(filter(None, fonts[start:stop]), None))
+            
+            flags = _CASE_FLAGS[detect_line_case(merged_text)]
+            if has_special_prefix(merged_text):
+                flags |= LINE_SPECIAL_PREFIX
+            line_flags[line_idx] |= flags
+        page_lines.flags = line_flags
+    
+    return page_lines
+
+def _parse_page_range(pdf_bytes, start, stop):
+    """Process-pool worker: opens its own copy of the document and parses pages [start, stop)."""
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        pages = (_parse_page(doc[page_num], page_num) for page_num in range(start, stop))
+        return [page for page in pages if page is not None]
+
 def extract_pdf_lines_cleaned_and_merged(pdf_bytes: bytes) -> list:
     """
     Parses PDF bytes and extracts structured line-by-line data.
@@ -45,70 +419,81 @@ def extract_pdf_lines_cleaned_and_merged(pdf_bytes: bytes) -> list:
     Returns:
         A list of pages, each containing structured data about its lines.
     """
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-    pages_data = []
-
-    for page_num, page in enumerate(doc):
-        y_line_map = defaultdict(list)
-        try:
-            blocks = page.get_text("dict")["blocks"]
-        except Exception:
-            continue # Skip page if text extraction fails
-
-        for block in blocks:
-            if block.get('type') != 0:
-                continue
-            for line in block.get("lines", []):
-                for span in line.get("spans", []):
-                    text = span.get("text", "").strip()
-                    if not text:
-                        continue
-
-                    y_key = round(span["bbox"][1], 1)
-                    y_line_map[y_key].append({
-                        "text": text,
-                        "font_size": normalize_font_size(span.get("size")),
-                        "font_name": span.get("font"),
-                        "bold": "Bold" in span.get("font", ""),
-                        "italic": "Italic" in span.get("font", "") or "Oblique" in span.get("font", ""),
-                        "position_x": round(span["bbox"][0], 1),
-                        "position_y": y_key,
-                        "page_number": page_num + 1
-                    })
-
-        page_lines = []
-        for y_key in sorted(y_line_map.keys()):
-            line_spans = sorted(y_line_map[y_key], key=lambda s: s["position_x"])
-            merged_text = " ".join([s["text"] for s in line_spans])
-            font_sizes = [s["font_size"] for s in line_spans if s["font_size"] is not None]
-            fonts = [s["font_name"] for s in line_spans if s["font_name"]]
-            bold = any(s["bold"] for s in line_spans)
-            italic = any(s["italic"] for s in line_spans)
-            x = min([s["position_x"] for s in line_spans]) if line_spans else 0
-            
-            page_lines.append({
-                "text": merged_text,
-                "font_size": max(font_sizes) if font_sizes else None,
-                "font_name": fonts[0] if fonts else None,
-                "bold": bold,
-                "italic": italic,
-                "position_x": x,
-                "position_y": y_key,
-                "page_number": page_num + 1,
-                "line_length": len(merged_text),
-                "is_centered": is_centered(x),
-                "line_case": detect_line_case(merged_text),
-                "has_special_prefix": has_special_prefix(merged_text)
-            })
-        
-        pages_data.append({
-            "page_number": page_num + 1,
-            "content": page_lines
-        })
-    
-    doc.close()
+    return [
+        {"page_number": page.page_number, "content": page.to_dicts()}
+        for page in _extract_pages(pdf_bytes)
+    ]
+
+def _extract_pages(pdf_bytes, key=None):
+    """
+    PageLines for every page that has extractable text. Results are cached
+    by content and shared between callers, so treat them as read-only.
+    """
+    if key is None:
+        key = _content_key(pdf_bytes)
+    pages_data = _parsed_cache.get(key)
+    if pages_data is not None:
+        return pages_data
+
+    # The document is opened once here and handed down; only pool workers reopen it
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        pages_data = _parse_document(doc, pdf_bytes)
+
+    _parsed_cache.put(key, pages_data)
     return pages_data
 
+# Worker pool for long documents, started on first use and kept for the life of
+# the process. Workers come from a forkserver (spawn where unavailable): the
+# server process has request threads and torch loaded, which is unsafe to fork.
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                        mp_context=multiprocessing.get_context(method))
+        return _pool
+
+def _discard_pool(pool):
+    """Drops a pool whose worker died so the next long document starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+def _parse_document(doc, pdf_bytes):
+    """
+    Parses every page of an open document, picking sequential or process-pool
+    parsing from the page count. pdf_bytes is what pool workers open.
+    """
+    page_count = doc.page_count
+    workers = min(os.cpu_count() or 1, page_count // _RULES["min_pages_per_worker"])
+
+    # Shorter documents are parsed in-process; shipping the bytes to the workers
+    # and the parsed pages back costs more than it saves
+    if page_count <= _RULES["sequential_max_pages"] or workers < 2:
+        return _parse_pages_in_process(doc)
+
+    # Split the pages into one contiguous range per worker; map() keeps them in order
+    step = -(-page_count // workers)
+    starts = range(0, page_count, step)
+    stops = [min(start + step, page_count) for start in starts]
+    pool = _get_pool()
+    try:
+        chunks = pool.map(_parse_page_range, repeat(pdf_bytes), starts, stops)
+        return [page for chunk in chunks for page in chunk]
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        return _parse_pages_in_process(doc)
+
+def _parse_pages_in_process(doc):
+    pages = (_parse_page(page, page_num) for page_num, page in enumerate(doc))
+    return [page for page in pages if page is not None]
+
 def extract_medical_fields_from_pdf(pdf_bytes: bytes) -> dict:
     """
     Extracts medical information from PDF using structured text analysis.
@@ -117,15 +502,18 @@ def extract_medical_fields_from_pdf(pdf_bytes: bytes) -> dict:
     Returns:
         A dictionary with extracted medical fields.
     """
+    key = _content_key(pdf_bytes)
+    cached = _fields_cache.get(key)
+    if cached is not None:
+        return dict(cached)
+    
     try:
         # Get structured text data
-        pages_data = extract_pdf_lines_cleaned_and_merged(pdf_bytes)
+        pages_data = _extract_pages(pdf_bytes, key)
         
-        # Extract all text content for analysis
-        all_text = ""
-        for page in pages_data:
-            for line in page["content"]:
-                all_text += line["text"] + "\n"
+        # Extract all text content for analysis (one newline-terminated line per entry)
+        line_texts = [text for page in pages_data for text in page.texts]
+        all_text = "\n".join(line_texts) + "\n" if line_texts else ""
         
         # Initialize extracted fields
         extracted_fields = {
@@ -148,152 +536,34 @@ def extract_medical_fields_from_pdf(pdf_bytes: bytes) -> dict:
             "reportContent": "Report uploaded"
         }
         
-        # Extract patient name (look for patterns in title case or bold text)
-        name_patterns = [
-            r"Patient:\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",
-            r"Name:\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",
-            r"Patient Name:\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",
-            r"^([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s*$"  # Standalone names
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, all_text, re.MULTILINE)
-            if match:
-                extracted_fields["patientName"] = match.group(1).strip()
-                break
-        
-        # Extract age
-        age_patterns = [
-            r"Age:\s*(\d+)",
-            r"(\d+)\s*years?\s*old",
-            r"Age\s*(\d+)",
-            r"(\d+)\s*Y\/O"
-        ]
-        
-        for pattern in age_patterns:
-            match = re.search(pattern, all_text, re.IGNORECASE)
-            if match:
-                extracted_fields["age"] = match.group(1)
-                break
-        
-        # Extract sex/gender
-        sex_patterns = [
-            r"Sex:\s*(Male|Female|M|F)",
-            r"Gender:\s*(Male|Female|M|F)",
-            r"(Male|Female|M|F)\s*$"
-        ]
-        
-        for pattern in sex_patterns:
-            match = re.search(pattern, all_text, re.IGNORECASE)
-            if match:
-                extracted_fields["sex"] = match.group(1)
-                break
+        # Extract demographic fields; within each field the first matching pattern wins
+        for field, patterns in _DEMOGRAPHIC_FIELD_RES:
+            value = _first_match(patterns, all_text)
+            if value is not None:
+                extracted_fields[field] = value.strip()
+        if extracted_fields["abhaId"] == "Unknown":
+            extracted_fields["abhaId"] = _abha_number_token(all_text) or "Unknown"
         
         # Extract date of birth
-        dob_patterns = [
-            r"DOB:\s*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})",
-            r"Date of Birth:\s*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})",
-            r"Birth Date:\s*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})",
-            r"(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})"
-        ]
-        
-        for pattern in dob_patterns:
-            match = re.search(pattern, all_text)
-            if match:
-                # Convert to YYYY-MM-DD format
-                date_str = match.group(1)
-                try:
-                    # Simple date parsing (you might want to use dateutil for more robust parsing)
-                    parts = re.split(r'[/-]', date_str)
-                    if len(parts) == 3:
-                        if len(parts[2]) == 2:  # Convert YY to YYYY
-                            parts[2] = '20' + parts[2] if int(parts[2]) < 50 else '19' + parts[2]
-                        extracted_fields["dob"] = f"{parts[2]}-{parts[0].zfill(2)}-{parts[1].zfill(2)}"
-                except:
-                    extracted_fields["dob"] = date_str
-                break
+        match = _first_search(_DOB_RES, all_text)
+        if match:
+            # Convert to YYYY-MM-DD format
+            month, day, year = match.groups()
+            if len(year) == 2:  # Convert YY to YYYY
+                year = '20' + year if int(year) < 50 else '19' + year
+            extracted_fields["dob"] = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
         
-        # Extract contact number
-        phone_patterns = [
-            r"Phone:\s*([\d\-\+\(\)\s]+)",
-            r"Contact:\s*([\d\-\+\(\)\s]+)",
-            r"Mobile:\s*([\d\-\+\(\)\s]+)",
-            r"(\d{3}[-.\s]?\d{3}[-.\s]?\d{4})"
-        ]
+        # Extract medical information using font analysis and positioning.
+        # Tag every line with the section keywords it contains in a single scan.
+        page_hits = [[_section_keyword_hits(text) for text in page.texts_lower] for page in pages_data]
         
-        for pattern in phone_patterns:
-            match = re.search(pattern, all_text)
-            if match:
-                extracted_fields["contactNumber"] = match.group(1).strip()
-                break
-        
-        # Extract patient ID
-        id_patterns = [
-            r"Patient ID:\s*([A-Za-z0-9\-_]+)",
-            r"ID:\s*([A-Za-z0-9\-_]+)",
-            r"Patient Number:\s*([A-Za-z0-9\-_]+)"
-        ]
-        
-        for pattern in id_patterns:
-            match = re.search(pattern, all_text)
-            if match:
-                extracted_fields["patientId"] = match.group(1).strip()
-                break
-        
-        # Extract ABHA ID
-        abha_patterns = [
-            r"ABHA ID:\s*([A-Za-z0-9\-_]+)",
-            r"ABHA:\s*([A-Za-z0-9\-_]+)",
-            r"([A-Za-z0-9\-_]{10,})"  # ABHA IDs are typically long
-        ]
-        
-        for pattern in abha_patterns:
-            match = re.search(pattern, all_text)
-            if match:
-                extracted_fields["abhaId"] = match.group(1).strip()
-                break
-        
-        # Extract medical information using font analysis and positioning
-        medical_sections = {
-            "previousCondition": ["Previous", "History", "Past Medical"],
-            "currentMedication": ["Medication", "Drugs", "Current Treatment"],
-            "familyHistory": ["Family", "Genetic", "Hereditary"],
-            "knownAllergy": ["Allergy", "Allergic", "Sensitivity"],
-            "chiefComplaint": ["Chief Complaint", "Main Symptom", "Primary Concern"],
-            "referringDoctor": ["Referring", "Referred by", "Doctor"],
-            "neurologicalSymptom": ["Neurological", "Neurologic", "Brain", "Nerve"],
-            "treatmentHistory": ["Treatment", "Therapy", "Intervention"],
-            "symptomProgression": ["Progression", "Worsening", "Improvement"]
-        }
-        
-        # Analyze text by font characteristics and positioning
-        for field, keywords in medical_sections.items():
-            found_text = []
-            
-            for page in pages_data:
-                for line in page["content"]:
-                    # Check if line contains relevant keywords
-                    if any(keyword.lower() in line["text"].lower() for keyword in keywords):
-                        # Look for content after the keyword
-                        for keyword in keywords:
-                            if keyword.lower() in line["text"].lower():
-                                # Extract text after the keyword
-                                parts = line["text"].split(keyword, 1)
-                                if len(parts) > 1 and parts[1].strip():
-                                    found_text.append(parts[1].strip())
-                                break
-                        
-                        # Also check next few lines for additional content
-                        current_y = line["position_y"]
-                        for next_line in page["content"]:
-                            if (next_line["position_y"] > current_y and 
-                                next_line["position_y"] <= current_y + 50 and  # Within 50 units
-                                next_line["text"].strip() and
-                                not any(k.lower() in next_line["text"].lower() for k in keywords)):
-                                found_text.append(next_line["text"].strip())
+        # Analyze text by font characteristics and positioning. Only the first
+        # 3 pieces are used, so stop scanning for a field once it has them.
+        for field, keywords in _MEDICAL_SECTIONS.items():
+            found_text = list(islice(_section_snippets(pages_data, page_hits, field, keywords), 3))
             
             if found_text:
-                extracted_fields[field] = " ".join(found_text[:3])  # Limit to first 3 pieces
+                extracted_fields[field] = " ".join(found_text)
             elif field in ["previousCondition", "currentMedication", "familyHistory", "knownAllergy"]:
                 extracted_fields[field] = "None reported"
             elif field in ["chiefComplaint", "referringDoctor", "neurologicalSymptom", "treatmentHistory", "symptomProgression"]:
@@ -301,10 +571,11 @@ def extract_medical_fields_from_pdf(pdf_bytes: bytes) -> dict:
         
         # Generate report content summary
         if pages_data:
-            total_lines = sum(len(page["content"]) for page in pages_data)
+            total_lines = sum(len(page) for page in pages_data)
             extracted_fields["reportContent"] = f"PDF report with {len(pages_data)} pages and {total_lines} text lines"
         
-        return extracted_fields
+        _fields_cache.put(key, extracted_fields)
+        return dict(extracted_fields)
         
     except Exception as e:
         print(f"Error extracting PDF fields: {str(e)}")
@@ -0,0 +1,68 @@
+import os
+import sys
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+
+# In-memory SQLite and a process-local cache instead of PostgreSQL and Redis
+Config.SQLALCHEMY_DATABASE_URI = "sqlite://"
+Config.CACHE_TYPE = "SimpleCache"
+
+from app import app as flask_app  # noqa: E402
+from auth import SESSION_COOKIE_NAME, _create_session  # noqa: E402
+from cache import cache  # noqa: E402
+from models import db, User  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    flask_app.config.update(TESTING=True)
+    with flask_app.app_context():
+        db.create_all()
+        # Ids match the session users: receptionists are id 2, dr.smith is id 1
+        db.session.add_all([
+            User(id=1, email="dr.smith@hospital.com", full_name="Dr. John Smith",
+                 role="doctor", password_hash="x"),
+            User(id=2, email="reception@hospital.com", full_name="Alex Parker",
+                 role="receptionist", password_hash="x"),
+        ])
+        db.session.commit()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+        cache.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login(client):
+    """Switch the test client's session cookie to the given user."""
+    def _login(email, role):
+        client.set_cookie(SESSION_COOKIE_NAME, _create_session(email, role))
+    return _login
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager collecting the SQL statements run inside it."""
+    @contextmanager
+    def _count():
+        statements = []
+        def _record(conn, cursor, statement, *args):
+            statements.append(statement)
+        engine = db.engine
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+    return _count
@@ -0,0 +1,69 @@
+def _create_assigned_intake(client, login):
+    login("reception@hospital.com", "receptionist")
+    resp = client.post("/api/intake", json={
+        "patientName": "John Doe",
+        "age": "45",
+        "contactNumber": "5551234567",
+        "assignedDoctorId": 1,
+    })
+    assert resp.status_code == 201
+    return resp.get_json()["patient"]
+
+
+def _search_by_id(client, custom_id):
+    resp = client.get("/api/patients/search-by-id", query_string={"patient_id": custom_id})
+    assert resp.status_code == 200
+    return resp.get_json()["patient"]
+
+
+def test_attend_patient_refreshes_search_by_id(client, login):
+    patient = _create_assigned_intake(client, login)
+    login("dr.smith@hospital.com", "doctor")
+    # Warm the cached payload before the write
+    assert _search_by_id(client, patient["patient_id"])["intake"]["report_content"] is None
+
+    resp = client.post("/api/doctor/1/attend-patient", json={"patient_id": patient["id"]})
+    assert resp.status_code == 200
+    assert _search_by_id(client, patient["patient_id"])["intake"]["report_content"] == "attended"
+
+
+def test_undo_attend_patient_refreshes_search_by_id(client, login):
+    patient = _create_assigned_intake(client, login)
+    login("dr.smith@hospital.com", "doctor")
+    client.post("/api/doctor/1/attend-patient", json={"patient_id": patient["id"]})
+    assert _search_by_id(client, patient["patient_id"])["intake"]["report_content"] == "attended"
+
+    resp = client.post("/api/doctor/1/undo-attend-patient", json={"patient_id": patient["id"]})
+    assert resp.status_code == 200
+    assert _search_by_id(client, patient["patient_id"])["intake"]["report_content"] is None
+
+
+def test_doctor_patient_lists_do_not_load_collections(client, login, count_queries):
+    patient = _create_assigned_intake(client, login)
+    login("dr.smith@hospital.com", "doctor")
+    client.post("/api/doctor/1/attend-patient", json={"patient_id": patient["id"]})
+
+    with count_queries() as statements:
+        resp = client.get("/api/doctor/1/attended-patients")
+    assert [p["id"] for p in resp.get_json()["attended_patients"]] == [patient["id"]]
+    assert len(statements) == 1
+
+    with count_queries() as statements:
+        resp = client.get("/api/doctor/1/assigned-patients")
+    assert [p["id"] for p in resp.get_json()["assigned_patients"]] == [patient["id"]]
+    assert len(statements) == 2
+
+
+def test_http_errors_are_json_and_keep_their_headers(client):
+    resp = client.get("/api/doctor/1/attend-patient")
+    assert resp.status_code == 405
+    assert resp.content_type == "application/json"
+    assert "POST" in resp.headers["Allow"]
+    assert "error" in resp.get_json()
+
+
+def test_not_found_is_json(client, login):
+    login("dr.smith@hospital.com", "doctor")
+    resp = client.get("/api/reports/999")
+    assert resp.status_code == 404
+    assert resp.get_json()["error"]
@@ -0,0 +1,51 @@
+def _post_intake(client, login, age):
+    login("reception@hospital.com", "receptionist")
+    return client.post("/api/intake", json={
+        "patientName": "Jane Roe",
+        "age": age,
+        "contactNumber": "5559876543",
+    })
+
+
+def test_intake_accepts_string_age(client, login):
+    resp = _post_intake(client, login, "45")
+    assert resp.status_code == 201
+    assert resp.get_json()["intake"]["age"] == "45"
+
+
+def test_intake_accepts_numeric_age(client, login):
+    resp = _post_intake(client, login, 45)
+    assert resp.status_code == 201
+    assert resp.get_json()["intake"]["age"] == "45"
+
+
+def test_intake_rejects_non_scalar_age(client, login):
+    resp = _post_intake(client, login, [45])
+    assert resp.status_code == 400
+
+
+def test_report_detail_is_one_query(client, login, count_queries):
+    patient = _post_intake(client, login, "45").get_json()["patient"]
+    resp = client.post("/api/reports", json={"patient_id": patient["id"], "report_type": "MRI"})
+    assert resp.status_code == 201
+    report_id = resp.get_json()["report"]["id"]
+
+    with count_queries() as statements:
+        resp = client.get(f"/api/reports/{report_id}")
+    assert resp.status_code == 200
+    assert resp.get_json()["report"]["patient"]["id"] == patient["id"]
+    assert len(statements) == 1
+
+
+def test_writes_succeed_when_cache_backend_is_down(client, login, monkeypatch):
+    from cache import cache
+    from models import Patient
+
+    def unavailable(*args, **kwargs):
+        raise ConnectionError("Error 111 connecting to localhost:6379. Connection refused.")
+    monkeypatch.setattr(cache.cache, "delete", unavailable)
+    monkeypatch.setattr(cache.cache, "delete_many", unavailable)
+
+    resp = _post_intake(client, login, "45")
+    assert resp.status_code == 201
+    assert Patient.query.filter_by(patient_id=resp.get_json()["patient"]["patient_id"]).count() == 1
@@ -0,0 +1,43 @@
+import fitz
+
+from pdf_extractor import _AGE_RES, _first_match, extract_pdf_lines_cleaned_and_merged
+
+LINE_KEYS = {
+    "text", "font_size", "font_name", "bold", "italic", "position_x", "position_y",
+    "page_number", "line_length", "is_centered", "line_case", "has_special_prefix",
+}
+
+
+def _pdf_bytes(*lines):
+    doc = fitz.open()
+    page = doc.new_page()
+    for i, (text, fontname) in enumerate(lines):
+        page.insert_text((72, 72 + 20 * i), text, fontname=fontname, fontsize=12)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_line_dicts_keep_their_keys_and_values():
+    pages = extract_pdf_lines_cleaned_and_merged(_pdf_bytes(
+        ("PATIENT REPORT", "hebo"),
+        ("1. Chief Complaint: headache", "helv"),
+    ))
+    assert len(pages) == 1 and pages[0]["page_number"] == 1
+    title, item = pages[0]["content"]
+    assert set(title) == LINE_KEYS and set(item) == LINE_KEYS
+    assert title["text"] == "PATIENT REPORT"
+    assert title["bold"] is True and title["line_case"] == "UPPER"
+    assert item["bold"] is False and item["has_special_prefix"] is True
+    assert item["line_length"] == len("1. Chief Complaint: headache")
+
+
+def test_age_patterns_on_long_digit_runs():
+    # A long digit run that no age pattern accepts used to be rescanned from
+    # every digit; the later labelled age must still be found
+    barcode = "7" * 20000
+    assert _first_match(_AGE_RES, f"Ref {barcode}\nPatient is 45 years old") == "45"
+    assert _first_match(_AGE_RES, f"{barcode} Y-O\n62 Y/O male") == "62"
+    # A run that does match is still captured whole, from its first digit
+    assert _first_match(_AGE_RES, f"Ref A{barcode} years old") == barcode
+    assert _first_match(_AGE_RES, barcode) is None